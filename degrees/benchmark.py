@@ -0,0 +1,174 @@
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import degrees
+
+USAGE = "Usage: python benchmark.py [directory] [people] [movies] [queries]"
+
+
+def main():
+    if len(sys.argv) > 5:
+        sys.exit(USAGE)
+    directory = sys.argv[1] if len(sys.argv) > 1 else "small"
+    people_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    movie_count = int(sys.argv[3]) if len(sys.argv) > 3 else 1500
+    query_count = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+
+    print(f"Dataset: {directory}")
+    degrees.load_data(directory)
+    ids = list(degrees.people)
+    if len(ids) <= 100:
+        pairs = [
+            (source, target)
+            for source in ids
+            for target in ids
+            if source != target
+        ]
+    else:
+        rng = random.Random(50)
+        pairs = [tuple(rng.sample(ids, 2)) for _ in range(query_count)]
+    compare_searches(pairs)
+    compare_layouts(directory, pairs)
+    compare_loaders(directory)
+
+    print(f"Synthetic graph: {people_count} people, {movie_count} movies")
+    synthetic_graph(people_count, movie_count)
+    rng = random.Random(50)
+    ids = list(degrees.people)
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(query_count)]
+    compare_searches(pairs)
+
+
+def clear_data():
+    """
+    Empties the data loaded into the degrees module.
+    """
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.graph = None
+
+
+def synthetic_graph(people_count, movie_count, cast_size=4, seed=0):
+    """
+    Replaces the loaded data with a random co-star graph where every
+    movie has `cast_size` stars picked uniformly from all people.
+    """
+    rng = random.Random(seed)
+    clear_data()
+    for i in range(people_count):
+        person_id = f"p{i}"
+        degrees.people[person_id] = {
+            "name": person_id,
+            "birth": "",
+            "movies": set()
+        }
+        degrees.names[person_id] = {person_id}
+    person_ids = list(degrees.people)
+    for i in range(movie_count):
+        movie_id = f"m{i}"
+        stars = set(rng.sample(person_ids, cast_size))
+        degrees.movies[movie_id] = {"title": movie_id, "year": "", "stars": stars}
+        for person_id in stars:
+            degrees.people[person_id]["movies"].add(movie_id)
+
+
+def compare_searches(pairs):
+    """
+    Runs every search over the same (source, target) pairs and prints
+    the number of neighbor expansions and the total wall-clock time.
+    """
+    searches = [
+        ("breadth-first", degrees.shortest_path),
+        ("bidirectional", degrees.bidirectional_shortest_path),
+    ]
+    lengths = {}
+    for label, search in searches:
+        expansions, elapsed, lengths[label] = run_search(search, pairs)
+        print(f"  {label:>14}: {expansions:>10} expansions, "
+              f"{elapsed:.4f}s over {len(pairs)} queries")
+    if len(set(map(tuple, lengths.values()))) != 1:
+        print("  WARNING: searches disagree on path lengths")
+
+
+def compare_layouts(directory, pairs):
+    """
+    Loads `directory` with the dict-of-sets layout and with the compact
+    CSR layout, and prints the memory held by the loaded data and the
+    bidirectional search throughput over `pairs` for each.
+    """
+    for label, compact in [("dict-of-sets", False), ("compact", True)]:
+        clear_data()
+        tracemalloc.start()
+        start = time.perf_counter()
+        degrees.load_data(directory, compact=compact, cache=False)
+        load_time = time.perf_counter() - start
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for source, target in pairs:
+            degrees.bidirectional_shortest_path(source, target)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:>14}: {memory / 2 ** 20:8.2f} MiB, "
+              f"loaded in {load_time:.3f}s, "
+              f"{len(pairs) / elapsed:.0f} queries/s")
+    clear_data()
+
+
+def compare_loaders(directory):
+    """
+    Loads `directory` in a fresh process with each loader and prints the
+    peak RSS of that process, since peak RSS can only grow within one.
+    """
+    loaders = [
+        ("dict-of-sets", "cache=False"),
+        ("compact", "compact=True, cache=False"),
+        ("streaming", "streaming=True"),
+    ]
+    for label, arguments in loaders:
+        script = (
+            "import degrees, streaming\n"
+            f"degrees.load_data({os.path.abspath(directory)!r}, {arguments})\n"
+            "print(streaming.peak_rss())\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout
+        print(f"  {label:>14}: peak RSS {float(output):.1f} MiB")
+
+
+def run_search(search, pairs):
+    """
+    Returns (expansions, seconds, path lengths) for `search` over `pairs`,
+    counting every call to `neighbors_for_person` as one expansion.
+    """
+    neighbors_for_person = degrees.neighbors_for_person
+    expansions = 0
+
+    def counting_neighbors(person_id):
+        nonlocal expansions
+        expansions += 1
+        return neighbors_for_person(person_id)
+
+    degrees.neighbors_for_person = counting_neighbors
+    lengths = []
+    try:
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = search(source, target)
+            lengths.append(None if path is None else len(path))
+        elapsed = time.perf_counter() - start
+    finally:
+        degrees.neighbors_for_person = neighbors_for_person
+    return expansions, elapsed, lengths
+
+
+if __name__ == "__main__":
+    main()
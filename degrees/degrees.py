@@ -1,7 +1,12 @@
 import csv
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import CompactGraph
+from nameindex import NameIndex
+from snapshot import read_snapshot, source_stamp, write_snapshot
+from streaming import DetailStore, load_adjacency, peak_rss
+from util import Node, StackFrontier, QueueFrontier, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +17,72 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph of people and movies, set when data is loaded with compact=True
+graph = None
 
-def load_data(directory):
+# DetailStore for names and titles, set when data is loaded with streaming=True
+details = None
+
+# NameIndex over names, for suggesting close matches to unknown names
+name_index = None
+
+
+def load_data(directory, compact=False, cache=True, streaming=False):
     """
     Load data from CSV files into memory.
+
+    With `compact`, the person-movie links are stored in a CompactGraph
+    instead of the "movies" and "stars" sets, and searches run on it.
+
+    With `cache`, the loaded data is saved as a binary snapshot next to
+    the CSVs and later runs load that instead, until a CSV changes.
+
+    With `streaming`, only the links in stars.csv are loaded, in chunks;
+    names and titles are read on demand through `details`. This ignores
+    `compact` and `cache`.
     """
+    global graph, details, name_index
+
+    details = None
+    if streaming:
+        graph = name_index = None
+        load_adjacency(directory, people, movies)
+        details = DetailStore(directory, names, people, movies)
+        return
+
+    if cache:
+        data = read_snapshot(directory, compact)
+        if data is not None:
+            names.update(data["names"])
+            people.update(data["people"])
+            movies.update(data["movies"])
+            graph = data["graph"]
+            name_index = data["name_index"]
+            return
+
+    # Stamp the CSVs before parsing, so a change made while they are read
+    # invalidates the snapshot instead of being saved under its stamp
+    stamp = source_stamp(directory) if cache else None
+    parse_data(directory, compact)
+    name_index = NameIndex(names, people)
+
+    if cache:
+        write_snapshot(directory, compact, stamp, {
+            "names": names,
+            "people": people,
+            "movies": movies,
+            "graph": graph,
+            "name_index": name_index,
+        })
+
+
+def parse_data(directory, compact):
+    """
+    Parse the CSV files in `directory` into `names`, `people`, `movies`
+    and, with `compact`, `graph`.
+    """
+    global graph
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -24,8 +90,9 @@ def load_data(directory):
             people[row["id"]] = {
                 "name": row["name"],
                 "birth": row["birth"],
-                "movies": set()
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]}
             else:
@@ -38,12 +105,20 @@ def load_data(directory):
             movies[row["id"]] = {
                 "title": row["title"],
                 "year": row["year"],
-                "stars": set()
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
+        if compact:
+            graph = CompactGraph(
+                list(people), list(movies),
+                ((row["person_id"], row["movie_id"]) for row in reader)
+            )
+            return
+        graph = None
         for row in reader:
             try:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
@@ -53,14 +128,22 @@ def load_data(directory):
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    arguments = sys.argv[1:]
+    streaming = "--streaming" in arguments
+    if streaming:
+        arguments.remove("--streaming")
+    if len(arguments) > 1:
+        sys.exit("Usage: python degrees.py [--streaming] [directory]")
+    directory = arguments[0] if arguments else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    load_data(directory, streaming=streaming)
+    peak = peak_rss()
+    if peak is None:
+        print("Data loaded.")
+    else:
+        print(f"Data loaded (peak RSS {peak:.1f} MiB).")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +152,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -77,6 +160,8 @@ def main():
         degrees = len(path)
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
+        if details is not None:
+            details.fill_path(path)
         for i in range(degrees):
             person1 = people[path[i][1]]["name"]
             person2 = people[path[i + 1][1]]["name"]
@@ -84,66 +169,202 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
 
-    Pseudocode:
-    Initialise the frontier
-    Add the source actor as the initial node in the frontier
-        Node parent will be null
-        Node state will be the source actor
-        Node actions will be the costars of the actors movies
-            Get the movies first
-            Then get the costars
-    
-    While true:
-
-    If frontier is empty:
-        return none
-
-    Remove node using QueueFrontier
-    Check if the returned node's state == the target actor
-        if it does, return the node and all parent nodes
-        break the loop
-    Using the returned node, add each costar from the actions, add it to the frontier as a new node
-        Node parent will be a pointer to the returned node
-        node state will be the costar themselves
-        node action will be all the costars
-
-    """
-
-    # initialise the frontier
-    search_frontier = QueueFrontier()  
-    source_node = Node(source, None, neighbors_for_person(source))
-    search_frontier.add(source_node)
-
-    while True:
-        if search_frontier.empty():
-            return None
-        search_node = search_frontier.remove()
-        for movie_star_pair in search_node.action:
-            if movie_star_pair[1] == target:
+    Breadth-first search where each Node's state is a person_id and its
+    action the movie_id that led there. A person's co-stars are only
+    looked up when their node is expanded, every person is queued at
+    most once, and the goal test happens as soon as a child is
+    generated.
+
+    If `stats` is a dictionary, it is filled with the number of nodes
+    generated and expanded, the peak frontier size and the time taken.
+    """
+    start = time.perf_counter()
+    generated = expanded = peak_frontier = 0
+
+    def record():
+        if stats is not None:
+            stats.update({
+                "generated": generated,
+                "expanded": expanded,
+                "peak_frontier": peak_frontier,
+                "seconds": time.perf_counter() - start,
+            })
+
+    if source == target:
+        record()
+        return []
+
+    frontier = DequeQueueFrontier()
+    frontier.add(Node(source, None, None))
+    reached = {source}
+    peak_frontier = 1
+
+    while not frontier.empty():
+        node = frontier.remove()
+        expanded += 1
+        for movie_id, person_id in neighbors_for_person(node.state):
+            if person_id in reached:
+                continue
+            child = Node(person_id, node, movie_id)
+            generated += 1
+            if person_id == target:
                 path = []
-                path.append(movie_star_pair)
-                while search_node.state != source:
-                    path.insert(0, search_node.state)
-                    search_node = search_node.parent
-                print(path)
-                return(path)
-            search_frontier.add(Node(movie_star_pair, search_node, neighbors_for_person(movie_star_pair[1])))
+                while child.parent is not None:
+                    path.append((child.action, child.state))
+                    child = child.parent
+                path.reverse()
+                record()
+                return path
+            reached.add(person_id)
+            frontier.add(child)
+        peak_frontier = max(peak_frontier, len(frontier.frontier))
+
+    record()
+    return None
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends at once.
+
+    If no possible path, returns None.
+
+    Each side keeps a map of person_id -> (movie_id, person_id) link back
+    towards its own root, which doubles as that side's explored set.
+    The smaller frontier is expanded one whole level at a time, and the
+    search stops as soon as a newly reached person is already known to
+    the other side. Because every level is finished before the meeting
+    check could be beaten by a shorter route, the first meeting point
+    always gives a shortest path.
+    """
+    if graph is not None:
+        return graph.shortest_path(source, target)
+    if source == target:
+        return []
+
+    # person_id -> (movie_id, previous person_id) towards the source
+    forward_parents = {source: None}
+    # person_id -> (movie_id, next person_id) towards the target
+    backward_parents = {target: None}
+
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, others = (
+                forward_frontier, forward_parents, backward_parents
+            )
+        else:
+            frontier, parents, others = (
+                backward_frontier, backward_parents, forward_parents
+            )
+
+        next_frontier = []
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                if neighbor_id in others:
+                    return join_paths(
+                        forward_parents, backward_parents, neighbor_id
+                    )
+                next_frontier.append(neighbor_id)
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def join_paths(forward_parents, backward_parents, meeting_id):
+    """
+    Stitches the two halves of a bidirectional search together at
+    `meeting_id` and returns the (movie_id, person_id) path from the
+    source to the target.
+    """
+    path = []
+    person_id = meeting_id
+    while forward_parents[person_id] is not None:
+        movie_id, previous_id = forward_parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous_id
+    path.reverse()
+
+    person_id = meeting_id
+    while backward_parents[person_id] is not None:
+        movie_id, next_id = backward_parents[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
+def distances_from(source):
+    """
+    Returns a dictionary mapping every person_id reachable from `source`
+    to their degrees of separation from `source` (0 for the source).
+    """
+    distances = {source: 0}
+    frontier = [source]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for person_id in frontier:
+            for _, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id not in distances:
+                    distances[neighbor_id] = distance
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return distances
+
+
+def separation_counts(source):
+    """
+    Returns a list whose entry `d` is the number of people exactly `d`
+    degrees of separation from `source`.
+    """
+    if graph is not None:
+        return graph.level_sizes(graph.person_index[source])
+    counts = []
+    for distance in distances_from(source).values():
+        while len(counts) <= distance:
+            counts.append(0)
+        counts[distance] += 1
+    return counts
+
 
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
+    if details is not None:
+        details.resolve_name(name)
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
-        return None
+        suggestions = suggest_names(name)
+        if not suggestions:
+            return None
+        print(f"No '{name}'. Did you mean:")
+        for suggestion in suggestions:
+            print(f"  {suggestion}")
+        name = input("Intended Name: ")
+        if name.lower() not in names:
+            return None
+        return person_id_for_name(name)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -162,11 +383,28 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def suggest_names(name, limit=5):
+    """
+    Returns up to `limit` known names closest to `name`, best first.
+    """
+    if name_index is None:
+        return []
+    return [match for match, _ in name_index.search(name, limit)]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index[person_id])
+        }
+    if person_id not in people:
+        # Only possible when streaming: people without movies are unknown
+        return set()
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,204 @@
+from array import array
+
+
+class CompactGraph():
+    """
+    Person-movie bipartite graph stored as compressed sparse rows.
+
+    Person and movie IDs are interned to dense integers. The movies of
+    person `p` are `person_movies[person_offsets[p]:person_offsets[p + 1]]`
+    and the stars of movie `m` are
+    `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`, so walking a
+    person's co-stars only reads from flat integer arrays.
+    """
+
+    def __init__(self, person_ids, movie_ids, stars):
+        """
+        Builds the graph from a list of person_ids, a list of movie_ids
+        and an iterable of (person_id, movie_id) pairs. Pairs naming an
+        unknown person or movie are skipped.
+        """
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(movie_ids)
+        }
+
+        star_people = array("l")
+        star_movies = array("l")
+        for person_id, movie_id in stars:
+            person = self.person_index.get(person_id)
+            movie = self.movie_index.get(movie_id)
+            if person is None or movie is None:
+                continue
+            star_people.append(person)
+            star_movies.append(movie)
+
+        self.person_offsets, self.person_movies = compress(
+            len(person_ids), star_people, star_movies
+        )
+        self.movie_offsets, self.movie_stars = compress(
+            len(movie_ids), star_movies, star_people
+        )
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Builds the graph from the `people` and `movies` dictionaries
+        filled by `degrees.load_data`.
+        """
+        stars = (
+            (person_id, movie_id)
+            for movie_id in movies
+            for person_id in movies[movie_id]["stars"]
+        )
+        return cls(list(people), list(movies), stars)
+
+    def neighbors(self, person):
+        """
+        Yields (movie_index, person_index) pairs for people who starred
+        with the person at index `person`.
+        """
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        person_movies = self.person_movies
+        for i in range(self.person_offsets[person],
+                       self.person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+    def shortest_path(self, source_id, target_id):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect `source_id` to `target_id`, or None if they are not
+        connected.
+
+        This is the same bidirectional breadth-first search as
+        `degrees.bidirectional_shortest_path`, run on integer indices
+        with the co-star loop inlined over the CSR arrays.
+        """
+        if source_id == target_id:
+            return []
+        source = self.person_index[source_id]
+        target = self.person_index[target_id]
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        forward_parents = {source: None}
+        backward_parents = {target: None}
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, others = (
+                    forward_frontier, forward_parents, backward_parents
+                )
+            else:
+                frontier, parents, others = (
+                    backward_frontier, backward_parents, forward_parents
+                )
+
+            next_frontier = []
+            for person in frontier:
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        neighbor = movie_stars[j]
+                        if neighbor in parents:
+                            continue
+                        parents[neighbor] = (movie, person)
+                        if neighbor in others:
+                            return self.join_paths(
+                                forward_parents, backward_parents, neighbor
+                            )
+                        next_frontier.append(neighbor)
+
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return None
+
+    def level_sizes(self, source):
+        """
+        Returns how many people are at each distance from the person at
+        index `source`, from distance 0 (just the source) upwards.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        visited = bytearray(len(self.person_ids))
+        visited[source] = 1
+        frontier = [source]
+        sizes = []
+        while frontier:
+            sizes.append(len(frontier))
+            next_frontier = []
+            for person in frontier:
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        neighbor = movie_stars[j]
+                        if not visited[neighbor]:
+                            visited[neighbor] = 1
+                            next_frontier.append(neighbor)
+            frontier = next_frontier
+        return sizes
+
+    def join_paths(self, forward_parents, backward_parents, meeting):
+        """
+        Stitches both halves of a search together at `meeting` and maps
+        the result back to (movie_id, person_id) pairs.
+        """
+        path = []
+        person = meeting
+        while forward_parents[person] is not None:
+            movie, previous = forward_parents[person]
+            path.append((movie, person))
+            person = previous
+        path.reverse()
+
+        person = meeting
+        while backward_parents[person] is not None:
+            movie, following = backward_parents[person]
+            path.append((movie, following))
+            person = following
+
+        return [
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in path
+        ]
+
+
+def compress(row_count, rows, columns):
+    """
+    Returns (offsets, values) CSR arrays for the (row, column) pairs
+    given as two parallel arrays, using a counting sort on `rows`.
+    """
+    offsets = array("l", [0]) * (row_count + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for row in range(row_count):
+        offsets[row + 1] += offsets[row]
+
+    values = array("l", [0]) * len(rows)
+    position = offsets[:-1]
+    for row, column in zip(rows, columns):
+        values[position[row]] = column
+        position[row] += 1
+    return offsets, values
@@ -0,0 +1,293 @@
+import os
+import pickle
+import sys
+import time
+from array import array
+
+import degrees
+from snapshot import source_stamp
+
+# Bump whenever the layout of the saved index changes
+INDEX_VERSION = 2
+
+MAGIC = b"LANDMARK"
+
+# Stored distance meaning "this landmark cannot reach the person"
+UNREACHABLE = 255
+
+INFINITY = float("inf")
+
+
+def main():
+    if len(sys.argv) < 2 or len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py directory [landmarks]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    stamp = source_stamp(directory)
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    path = index_path(directory)
+    index = LandmarkIndex.load(path, stamp)
+    if index is None or len(index.landmarks) != k:
+        print(f"Building index with {k} landmarks...")
+        index = LandmarkIndex.build(k)
+        index.save(path, stamp)
+    print("Index ready.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    lower, upper = index.bounds(source, target)
+    if lower == INFINITY:
+        sys.exit("Not connected.")
+    print(f"Between {lower} and {upper} degrees of separation.")
+
+    start = time.perf_counter()
+    path = index.shortest_path(source, target)
+    elapsed = time.perf_counter() - start
+    if path is None:
+        print("Not connected.")
+    else:
+        print(f"{len(path)} degrees of separation ({elapsed:.3f}s).")
+
+
+def index_path(directory):
+    """
+    Returns the path of the landmark index file for a data directory.
+    """
+    return os.path.join(directory, ".degrees-landmarks.index")
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from `k` landmark people to everyone else.
+
+    `distances[i][p]` is the degrees of separation between landmark `i`
+    and the person at index `p` of `person_ids`, stored one byte per
+    person (UNREACHABLE if they are not connected). By the triangle
+    inequality, every landmark L bounds the distance between s and t:
+
+        |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+    """
+
+    def __init__(self, person_ids, landmarks, distances):
+        self.person_ids = person_ids
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.landmarks = landmarks
+        self.distances = distances
+        # Distance from each landmark to the farthest person it reaches
+        self.eccentricity = [
+            max((d for d in row if d != UNREACHABLE), default=0)
+            for row in distances
+        ]
+
+    @classmethod
+    def build(cls, k):
+        """
+        Builds an index over the loaded data, using the `k` people with
+        the most co-star links as landmarks.
+        """
+        def links(person_id):
+            return len(degrees.neighbors_for_person(person_id))
+
+        person_ids = list(degrees.people)
+        landmarks = sorted(person_ids, key=links, reverse=True)[:k]
+        person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        distances = []
+        for landmark in landmarks:
+            row = array("B", [UNREACHABLE]) * len(person_ids)
+            for person_id, distance in degrees.distances_from(landmark).items():
+                row[person_index[person_id]] = min(distance, UNREACHABLE - 1)
+            distances.append(row)
+        return cls(person_ids, landmarks, distances)
+
+    @classmethod
+    def load(cls, path, stamp):
+        """
+        Returns the index saved at `path`, or None if there is none, it
+        was saved for CSVs other than those with the `source_stamp`
+        `stamp`, or it does not match the loaded data. A stale index
+        would give bounds that are simply wrong, not just loose.
+        """
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                version, saved_stamp, person_ids, landmarks = pickle.load(f)
+                if version != INDEX_VERSION or saved_stamp != stamp:
+                    return None
+                distances = []
+                for _ in landmarks:
+                    row = array("B")
+                    row.fromfile(f, len(person_ids))
+                    distances.append(row)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if len(person_ids) != len(degrees.people) or any(
+            person_id not in degrees.people for person_id in landmarks
+        ):
+            return None
+        return cls(person_ids, landmarks, distances)
+
+    def save(self, path, stamp):
+        """
+        Writes the index to `path`: a small header, tagged with the
+        `source_stamp` of the CSVs it was built from, followed by one raw
+        byte row per landmark.
+        """
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            pickle.dump(
+                (INDEX_VERSION, stamp, self.person_ids, self.landmarks), f
+            )
+            for row in self.distances:
+                row.tofile(f)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two person_ids in O(k). `lower` is infinite when some landmark
+        reaches one but not the other, and `upper` is infinite when no
+        landmark reaches both.
+        """
+        s = self.person_index[source]
+        t = self.person_index[target]
+        lower = 0
+        upper = INFINITY
+        for row in self.distances:
+            ds, dt = row[s], row[t]
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                if ds != dt:
+                    return INFINITY, INFINITY
+                continue
+            lower = max(lower, abs(ds - dt))
+            upper = min(upper, ds + dt)
+        if source == target:
+            return 0, 0
+        return lower, upper
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect the source to the target, or None if they are not
+        connected.
+
+        This is `degrees.bidirectional_shortest_path` with landmark
+        pruning: a person reached at depth d from one end is dropped when
+        d plus the lower bound on their distance to the other end exceeds
+        the upper bound on the whole path. Such a person cannot be on a
+        shortest path, so the first meeting still gives one.
+
+        Pruning only pays off when the bounds are tight. On graphs where
+        they are loose it removes few people and the O(k) estimates make
+        this slower than the plain bidirectional search.
+        """
+        lower, upper = self.bounds(source, target)
+        if lower == INFINITY:
+            return None
+        if source == target:
+            return []
+
+        forward_parents = {source: None}
+        backward_parents = {target: None}
+        forward_frontier = [source]
+        backward_frontier = [target]
+        forward_depth = backward_depth = 0
+        source_row = self.column(source)
+        target_row = self.column(target)
+        source_cap = self.largest_estimate(source_row)
+        target_cap = self.largest_estimate(target_row)
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, others = (
+                    forward_frontier, forward_parents, backward_parents
+                )
+                forward_depth += 1
+                depth, goal_row, cap = forward_depth, target_row, target_cap
+            else:
+                frontier, parents, others = (
+                    backward_frontier, backward_parents, forward_parents
+                )
+                backward_depth += 1
+                depth, goal_row, cap = backward_depth, source_row, source_cap
+
+            # Estimating costs O(k) per person, so skip it on levels where
+            # not even the largest possible estimate could prune anyone
+            pruning = depth + cap > upper
+            next_frontier = []
+            for person_id in frontier:
+                for movie_id, neighbor_id in degrees.neighbors_for_person(
+                    person_id
+                ):
+                    if neighbor_id in parents:
+                        continue
+                    if neighbor_id in others:
+                        parents[neighbor_id] = (movie_id, person_id)
+                        return degrees.join_paths(
+                            forward_parents, backward_parents, neighbor_id
+                        )
+                    if pruning and (
+                        depth + self.estimate(neighbor_id, goal_row) > upper
+                    ):
+                        continue
+                    parents[neighbor_id] = (movie_id, person_id)
+                    next_frontier.append(neighbor_id)
+
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return None
+
+    def column(self, person_id):
+        """
+        Returns the distances from every landmark to `person_id`.
+        """
+        p = self.person_index[person_id]
+        return [row[p] for row in self.distances]
+
+    def largest_estimate(self, goal_row):
+        """
+        Returns the largest lower bound `estimate` can give for anyone
+        connected to the person whose `column` is `goal_row`.
+        """
+        cap = 0
+        for eccentricity, dg in zip(self.eccentricity, goal_row):
+            if dg != UNREACHABLE:
+                cap = max(cap, dg, eccentricity - dg)
+        return cap
+
+    def estimate(self, person_id, goal_row):
+        """
+        Returns the landmark lower bound on the distance from `person_id`
+        to the person whose `column` is `goal_row`.
+        """
+        p = self.person_index[person_id]
+        bound = 0
+        for row, dg in zip(self.distances, goal_row):
+            dp = row[p]
+            if dp == UNREACHABLE or dg == UNREACHABLE:
+                if dp != dg:
+                    return INFINITY
+                continue
+            if dp - dg > bound:
+                bound = dp - dg
+            elif dg - dp > bound:
+                bound = dg - dp
+        return bound
+
+if __name__ == "__main__":
+    main()
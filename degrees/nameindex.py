@@ -0,0 +1,179 @@
+import bisect
+import heapq
+from array import array
+from collections import Counter
+
+# Edits a query may differ by from a name and still be sure to find it
+MAX_TYPOS = 1
+
+# At most this many names starting with the query are scored
+PREFIX_SCAN = 1000
+
+# Hits in another posting list are counted to rule candidates out only
+# while it is at most this many times longer than the candidates left
+COUNT_RATIO = 10
+
+# When no name is within MAX_TYPOS edits, this many of a query's rarest
+# trigrams are used to find candidates
+PROBE_TRIGRAMS = 4
+
+# Candidates sharing the most probe trigrams that then get fully scored
+SHORTLIST = 100
+
+
+class NameIndex():
+    """
+    Prefix and trigram index over the lowercase names in `degrees.names`,
+    for ranking approximate matches without scanning every name.
+
+    Posting lists hold positions in `by_length`, the names in order of
+    length, so the names of a range of lengths are one slice of each
+    list, starting at `length_start[length]`.
+    """
+
+    def __init__(self, names, people):
+        """
+        Builds the index from the `names` and `people` dictionaries filled
+        by `degrees.load_data`.
+        """
+        self.keys = sorted(names)
+        self.display = [
+            people[next(iter(names[key]))]["name"] for key in self.keys
+        ]
+        self.by_length = array("l", sorted(
+            range(len(self.keys)), key=lambda i: len(self.keys[i])
+        ))
+        longest = len(self.keys[self.by_length[-1]]) if self.keys else 0
+        self.length_start = array("l", [0]) * (longest + 2)
+        for i in self.by_length:
+            self.length_start[len(self.keys[i]) + 1] += 1
+        for length in range(longest + 1):
+            self.length_start[length + 1] += self.length_start[length]
+
+        postings = {}
+        self.sizes = array("l", [0]) * len(self.keys)
+        for position, i in enumerate(self.by_length):
+            grams = trigrams(self.keys[i])
+            for gram in grams:
+                if gram not in postings:
+                    postings[gram] = array("l")
+                postings[gram].append(position)
+            self.sizes[i] = len(grams)
+        self.postings = postings
+
+    def search(self, query, limit=5):
+        """
+        Returns up to `limit` (name, score) pairs for the names closest to
+        `query`, best first. Scores run from 0 to 1, with 1 for an exact
+        match; names that start with the query get a small bonus.
+
+        Every name within `MAX_TYPOS` edits of the query is scored, along
+        with up to `PREFIX_SCAN` names that start with it. An edit changes
+        the length by at most one and at most three trigrams, so such a
+        name shares all but 3 * `MAX_TYPOS` of the query's trigrams and
+        has to be in the slice of one of just enough of their rarest
+        posting lists. Counting its hits in the next few lists rules out
+        most of the names found there without scoring them. Only when
+        neither finds a name are the names sharing the most of the rarest
+        trigrams of any length scored instead.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        scores = self.prefix_scores(query, query_grams)
+
+        needed = len(query_grams) - 3 * MAX_TYPOS
+        if needed > 0:
+            top = len(self.length_start) - 1
+            low = self.length_start[min(len(query) - MAX_TYPOS, top)]
+            high = self.length_start[min(len(query) + MAX_TYPOS + 1, top)]
+            slices = []
+            for gram in query_grams:
+                posting = self.postings.get(gram, ())
+                slices.append(posting[bisect.bisect_left(posting, low):
+                                      bisect.bisect_left(posting, high)])
+            slices.sort(key=len)
+            probed = len(slices) - needed + 1
+            hits = Counter()
+            for posting in slices[:probed]:
+                hits.update(posting)
+            candidates = list(hits)
+            for posting in slices[probed:]:
+                if len(posting) > COUNT_RATIO * len(candidates):
+                    break
+                hits.update(posting)
+                probed += 1
+                missing = len(slices) - probed
+                candidates = [position for position in candidates
+                              if hits[position] + missing >= needed]
+            for position in candidates:
+                i = self.by_length[position]
+                if i not in scores:
+                    scores[i] = self.score(i, query, query_grams)
+
+        if not scores:
+            probes = sorted(
+                (self.postings[gram] for gram in query_grams
+                 if gram in self.postings),
+                key=len
+            )[:PROBE_TRIGRAMS]
+            hits = {}
+            for posting in probes:
+                for position in posting:
+                    hits[position] = hits.get(position, 0) + 1
+            for position in sorted(hits, key=hits.get,
+                                   reverse=True)[:SHORTLIST]:
+                i = self.by_length[position]
+                if i not in scores:
+                    scores[i] = self.score(i, query, query_grams)
+
+        best = heapq.nsmallest(limit, [
+            (-score, self.display[i]) for i, score in scores.items()
+        ])
+        return [(name, round(-score, 3)) for score, name in best]
+
+    def prefix_scores(self, query, query_grams):
+        """
+        Returns the scores of up to `PREFIX_SCAN` names starting with
+        `query`, by index. Such a name has every trigram of the query but
+        perhaps the last, so only that one needs to be looked for.
+        """
+        last = f"{query[-2:]} " if len(query) > 1 else f" {query} "
+        count = len(query_grams)
+        scores = {}
+        start = bisect.bisect_left(self.keys, query)
+        for i in range(start, min(start + PREFIX_SCAN, len(self.keys))):
+            key = self.keys[i]
+            if not key.startswith(query):
+                break
+            if key == query:
+                scores[i] = 1.0
+                continue
+            shared = count - 1 + (last in f"  {key} ")
+            score = shared / (self.sizes[i] + count - shared)
+            scores[i] = min(0.99, score + 0.1)
+        return scores
+
+    def score(self, i, query, query_grams):
+        """
+        Returns the score of the name at index `i` for `query`: the
+        Jaccard similarity of their trigrams, plus the prefix bonus.
+        """
+        key = self.keys[i]
+        if key == query:
+            return 1.0
+        shared = len(trigrams(key) & query_grams)
+        score = shared / (self.sizes[i] + len(query_grams) - shared)
+        if key.startswith(query):
+            score = min(0.99, score + 0.1)
+        return score
+
+
+def trigrams(name):
+    """
+    Returns the set of three-character substrings of `name`, padded so
+    that the start and end of the name form trigrams of their own.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -0,0 +1,251 @@
+import csv
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+USAGE = (
+    "Usage: python queries.py directory batch [file]\n"
+    "       python queries.py directory http [port]\n"
+    "       python queries.py directory socket path"
+)
+
+
+def main():
+    if len(sys.argv) < 3 or len(sys.argv) > 4:
+        sys.exit(USAGE)
+    directory, mode = sys.argv[1], sys.argv[2]
+    argument = sys.argv[3] if len(sys.argv) == 4 else None
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, compact=True)
+    print("Data loaded.", file=sys.stderr)
+
+    stats = QueryStats()
+    if mode == "batch":
+        if argument is None or argument == "-":
+            run_batch(sys.stdin, sys.stdout, stats)
+        else:
+            with open(argument, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, stats)
+        print(json.dumps(stats.summary()), file=sys.stderr)
+    elif mode == "http":
+        serve_http(int(argument or 8000), stats)
+    elif mode == "socket" and argument is not None:
+        serve_socket(argument, stats)
+    else:
+        sys.exit(USAGE)
+
+
+class QueryStats():
+    """
+    Thread-safe record of per-query latencies.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.started = time.perf_counter()
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def summary(self):
+        """
+        Returns the query count, throughput and latency percentiles
+        (in milliseconds) as a dictionary.
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+        elapsed = time.perf_counter() - self.started
+        summary = {
+            "queries": len(latencies),
+            "elapsed_s": round(elapsed, 3),
+            "queries_per_s": round(len(latencies) / elapsed, 1),
+        }
+        if latencies:
+            summary.update({
+                "mean_ms": round(1000 * sum(latencies) / len(latencies), 3),
+                "p50_ms": round(1000 * percentile(latencies, 50), 3),
+                "p95_ms": round(1000 * percentile(latencies, 95), 3),
+                "max_ms": round(1000 * latencies[-1], 3),
+            })
+        return summary
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of the sorted list `values`.
+    """
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+
+def answer(source_name, target_name, stats=None):
+    """
+    Returns a JSON-ready dictionary describing the shortest path between
+    two people given by name, or an "error" if it cannot be answered.
+
+    Ambiguous names are not resolved interactively; the error lists the
+    matching person_ids instead.
+    """
+    start = time.perf_counter()
+    result = {"source": source_name, "target": target_name}
+
+    source = resolve_name(source_name, result)
+    target = resolve_name(target_name, result)
+    if source is not None and target is not None:
+        path = degrees.bidirectional_shortest_path(source, target)
+        if path is None:
+            result["degrees"] = None
+            result["path"] = []
+        else:
+            result["degrees"] = len(path)
+            result["path"] = describe_path(source, path)
+
+    elapsed = time.perf_counter() - start
+    result["elapsed_ms"] = round(1000 * elapsed, 3)
+    if stats is not None:
+        stats.record(elapsed)
+    return result
+
+
+def resolve_name(name, result):
+    """
+    Returns the only person_id for `name`, or None after adding an
+    "error" to `result`.
+    """
+    person_ids = sorted(degrees.names.get(name.lower(), set()))
+    if len(person_ids) == 1:
+        return person_ids[0]
+    if person_ids:
+        result["error"] = f"ambiguous name: {name}"
+        result["candidates"] = person_ids
+    else:
+        result["error"] = f"person not found: {name}"
+        result["suggestions"] = degrees.suggest_names(name)
+    return None
+
+
+def describe_path(source, path):
+    """
+    Returns each step of `path` as a dictionary naming both people and
+    the movie they starred in.
+    """
+    steps = []
+    previous = source
+    for movie_id, person_id in path:
+        steps.append({
+            "person1": degrees.people[previous]["name"],
+            "person2": degrees.people[person_id]["name"],
+            "movie": degrees.movies[movie_id]["title"],
+        })
+        previous = person_id
+    return steps
+
+
+def run_batch(lines, out, stats):
+    """
+    Answers every `source,target` line read from `lines`, writing one
+    JSON object per line to `out` as soon as it is answered.
+    """
+    for row in csv.reader(lines):
+        if len(row) != 2:
+            continue
+        result = answer(row[0].strip(), row[1].strip(), stats)
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def serve_http(port, stats):
+    """
+    Answers GET /path?source=...&target=... and GET /stats on
+    localhost:`port` until interrupted, one thread per request.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/stats":
+                self.reply(200, stats.summary())
+            elif url.path == "/path" and "source" in query and "target" in query:
+                self.reply(200, answer(
+                    query["source"][0], query["target"][0], stats
+                ))
+            else:
+                self.reply(404, {"error": "use /path?source=&target= or /stats"})
+
+        def reply(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    with ThreadingHTTPServer(("127.0.0.1", port), Handler) as server:
+        print(f"Serving on http://127.0.0.1:{port}", file=sys.stderr)
+        serve_until_interrupted(server, stats)
+
+
+def serve_socket(path, stats):
+    """
+    Answers queries on the Unix socket at `path` until interrupted.
+    Clients send `source,target` lines and get JSON lines back, exactly
+    like batch mode; a line reading `stats` returns the stats summary.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode("utf-8").strip()
+                if line == "stats":
+                    result = stats.summary()
+                else:
+                    row = next(csv.reader([line]), [])
+                    if len(row) != 2:
+                        result = {"error": "expected source,target"}
+                    else:
+                        result = answer(row[0].strip(), row[1].strip(), stats)
+                self.wfile.write((json.dumps(result) + "\n").encode("utf-8"))
+
+    # Only clear out a stale socket, never some other file at `path`
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            sys.exit(f"{path} exists and is not a socket")
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Serving on {path}", file=sys.stderr)
+        try:
+            serve_until_interrupted(server, stats)
+        finally:
+            os.remove(path)
+
+
+def serve_until_interrupted(server, stats):
+    """
+    Runs `server` until Ctrl-C, then prints the stats summary.
+    """
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(stats.summary()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import sys
+import time
+
+import degrees
+
+USAGE = "Usage: python separation.py directory [processes] [sources]"
+
+
+def main():
+    if len(sys.argv) < 2 or len(sys.argv) > 4:
+        sys.exit(USAGE)
+    directory = sys.argv[1]
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    source_count = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    degrees.load_data(directory, compact=True)
+    sources = list(degrees.people)[:source_count]
+
+    start = time.perf_counter()
+    histogram, eccentricity = separation_histogram(
+        directory, sources, processes
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(sources)} sources in {elapsed:.2f}s "
+          f"with {processes or os.cpu_count()} processes")
+    print("Degrees  Pairs")
+    for distance in sorted(histogram, key=lambda d: (d is None, d)):
+        label = "none" if distance is None else distance
+        print(f"{label:>7}  {histogram[distance]}")
+
+    print("Highest eccentricity:")
+    farthest = sorted(eccentricity, key=eccentricity.get, reverse=True)
+    for person_id in farthest[:10]:
+        name = degrees.people[person_id]["name"]
+        print(f"  {name} ({person_id}): {eccentricity[person_id]}")
+
+
+def separation_histogram(directory, sources=None, processes=None,
+                         shard_size=64):
+    """
+    Runs a single-source breadth-first search from every person in
+    `sources` (default: everyone) across a pool of `processes` workers.
+
+    Returns (histogram, eccentricity): `histogram` maps degrees of
+    separation to the number of (source, target) pairs at that distance,
+    with key None counting unreachable pairs, and `eccentricity` maps
+    each source to its distance from the farthest person it can reach.
+    """
+    if not degrees.people:
+        degrees.load_data(directory, compact=True)
+    if sources is None:
+        sources = list(degrees.people)
+    shards = [
+        sources[i:i + shard_size] for i in range(0, len(sources), shard_size)
+    ]
+
+    histogram = {}
+    eccentricity = {}
+    with multiprocessing.Pool(processes, initializer=load_worker,
+                              initargs=(directory,)) as pool:
+        for shard_histogram, shard_eccentricity in pool.imap_unordered(
+            shard_separations, shards
+        ):
+            for distance, count in shard_histogram.items():
+                histogram[distance] = histogram.get(distance, 0) + count
+            eccentricity.update(shard_eccentricity)
+    return histogram, eccentricity
+
+
+def load_worker(directory):
+    """
+    Makes sure a pool worker has the data loaded. Forked workers inherit
+    it from the parent; spawned ones load it from the snapshot.
+    """
+    if not degrees.people:
+        degrees.load_data(directory, compact=True)
+
+
+def shard_separations(sources):
+    """
+    Returns the (histogram, eccentricity) for one shard of sources.
+    """
+    total = len(degrees.people)
+    histogram = {}
+    eccentricity = {}
+    for source in sources:
+        counts = degrees.separation_counts(source)
+        for distance, count in enumerate(counts[1:], start=1):
+            histogram[distance] = histogram.get(distance, 0) + count
+        unreachable = total - sum(counts)
+        if unreachable:
+            histogram[None] = histogram.get(None, 0) + unreachable
+        eccentricity[source] = len(counts) - 1
+    return histogram, eccentricity
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import pickle
+
+# Bump whenever the layout of the pickled data changes
+SNAPSHOT_VERSION = 3
+
+MAGIC = b"DEGREES\0"
+
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+def snapshot_path(directory, compact):
+    """
+    Returns the path of the snapshot file for a data directory.
+    """
+    layout = "compact" if compact else "sets"
+    return os.path.join(directory, f".degrees-{layout}.snapshot")
+
+
+def source_stamp(directory):
+    """
+    Returns the (mtime in ns, size) of every source CSV in `directory`.
+    """
+    stamp = {}
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stamp[filename] = (stat.st_mtime_ns, stat.st_size)
+    return stamp
+
+
+def read_snapshot(directory, compact):
+    """
+    Returns the data saved by `write_snapshot` for `directory`, or None
+    if there is no snapshot, it was written by another version, or any
+    source CSV has changed since it was written.
+    """
+    try:
+        with open(snapshot_path(directory, compact), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            version, stamp = pickle.load(f)
+            if version != SNAPSHOT_VERSION or stamp != source_stamp(directory):
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+
+
+def write_snapshot(directory, compact, stamp, data):
+    """
+    Saves `data` as the snapshot for `directory`, tagged with the
+    snapshot version and `stamp`, the `source_stamp` of the CSVs taken
+    before `data` was parsed from them.
+
+    The file is written next to the CSVs and moved into place once
+    complete, so a crash never leaves a partial snapshot behind. A
+    directory that cannot be written to is silently skipped.
+    """
+    path = snapshot_path(directory, compact)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            pickle.dump((SNAPSHOT_VERSION, stamp), f)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
@@ -0,0 +1,127 @@
+import csv
+import itertools
+import sys
+
+# Number of stars.csv rows read and linked at a time
+CHUNK_SIZE = 65536
+
+
+def load_adjacency(directory, people, movies, chunk_size=CHUNK_SIZE):
+    """
+    Fills `people` and `movies` with only the person-movie links from
+    stars.csv, read `chunk_size` rows at a time.
+
+    Entries hold just a "movies" or "stars" set; names, births, titles
+    and years are left to a DetailStore. IDs are interned so the keys
+    and set members share one string per ID. As in `degrees.load_data`,
+    rows naming a person or movie missing from people.csv or movies.csv
+    are skipped, so only the ID columns of those files are read here.
+    """
+    person_ids = known_ids(f"{directory}/people.csv")
+    movie_ids = known_ids(f"{directory}/movies.csv")
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                break
+            for person_id, movie_id in chunk:
+                if person_id not in person_ids or movie_id not in movie_ids:
+                    continue
+                person_id = sys.intern(person_id)
+                movie_id = sys.intern(movie_id)
+                if person_id not in people:
+                    people[person_id] = {"movies": set()}
+                if movie_id not in movies:
+                    movies[movie_id] = {"stars": set()}
+                people[person_id]["movies"].add(movie_id)
+                movies[movie_id]["stars"].add(person_id)
+
+
+def known_ids(path):
+    """
+    Returns the set of interned IDs in the first column of a CSV file.
+    """
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return {sys.intern(row[0]) for row in reader if row}
+
+
+class DetailStore():
+    """
+    Lazily reads names and titles from people.csv and movies.csv.
+
+    Nothing is read until a name has to be resolved or a path printed,
+    and then only the matching rows are kept, copied into the `names`,
+    `people` and `movies` dictionaries the rest of degrees.py uses.
+    """
+
+    def __init__(self, directory, names, people, movies):
+        self.directory = directory
+        self.names = names
+        self.people = people
+        self.movies = movies
+
+    def resolve_name(self, name):
+        """
+        Adds every person called `name` to `names` and `people`.
+        """
+        name = name.lower()
+        if name in self.names:
+            return
+        for row in self.rows("people.csv"):
+            if row["name"].lower() == name:
+                self.names.setdefault(name, set()).add(row["id"])
+                self.add_person(row)
+
+    def fill_path(self, path):
+        """
+        Adds the names and titles needed to print a list of
+        (movie_id, person_id) pairs.
+        """
+        person_ids = {
+            person_id for _, person_id in path
+            if "name" not in self.people.get(person_id, {})
+        }
+        movie_ids = {
+            movie_id for movie_id, _ in path
+            if movie_id is not None
+            and "title" not in self.movies.get(movie_id, {})
+        }
+        if person_ids:
+            for row in self.rows("people.csv"):
+                if row["id"] in person_ids:
+                    self.add_person(row)
+        if movie_ids:
+            for row in self.rows("movies.csv"):
+                if row["id"] in movie_ids:
+                    movie = self.movies.setdefault(row["id"], {"stars": set()})
+                    movie["title"] = row["title"]
+                    movie["year"] = row["year"]
+
+    def add_person(self, row):
+        person = self.people.setdefault(row["id"], {"movies": set()})
+        person["name"] = row["name"]
+        person["birth"] = row["birth"]
+
+    def rows(self, filename):
+        with open(f"{self.directory}/{filename}", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in MiB, or None
+    where the `resource` module is not available, such as on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
@@ -0,0 +1,119 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from generator import generate_puzzle
+from logic import *
+
+# Methods to compare, with the largest symbol count each is run on
+METHODS = {
+    "enumerate": 16,
+    "compiled": 20,
+    "truth table": 24,
+    "parallel": 20,
+    "gray": 20,
+    "pruning": 40,
+    "sat": None,
+}
+
+
+USAGE = "Usage: python benchmark.py [random|puzzles] [seed]"
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit(USAGE)
+    suite = sys.argv[1] if len(sys.argv) > 1 else "random"
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    if suite == "random":
+        benchmark_random(seed)
+    elif suite == "puzzles":
+        benchmark_puzzles(seed)
+    else:
+        sys.exit(USAGE)
+
+
+def benchmark_random(seed):
+    """
+    Prints the time each method takes on random 3-CNF knowledge bases
+    of growing size.
+    """
+    print(f"{'symbols':>8}" + "".join(f"{method:>12}" for method in METHODS))
+    for n in [4, 8, 12, 16, 20, 24, 40, 80, 160]:
+        knowledge, query = random_problem(n, random.Random(seed + n))
+        row = f"{n:>8}"
+        answers = set()
+        for method, limit in METHODS.items():
+            if limit is not None and n > limit:
+                row += f"{'-':>12}"
+                continue
+            start = time.perf_counter()
+            answers.add(model_check(knowledge, query, method=method))
+            row += f"{time.perf_counter() - start:>11.4f}s"
+        if len(answers) > 1:
+            row += "  MISMATCH"
+        print(row)
+
+
+def benchmark_puzzles(seed):
+    """
+    Prints the time, peak traced memory and work done by each method on
+    generated knights and knaves puzzles with N characters and 3N
+    statements. Each query is the true fact about the first character,
+    so the enumerating methods have to visit the whole model space.
+    """
+    print("characters,statements,symbols,method,seconds,peak_kib,"
+          "models,pruned,conflicts")
+    for n in [2, 3, 4, 6, 8, 10, 12, 20, 40, 80]:
+        rng = random.Random(seed + n)
+        knowledge, symbols, solution = generate_puzzle(n, 3 * n, rng)
+        query = symbols[0] if symbols[0] in solution else Not(symbols[0])
+        for method, limit in METHODS.items():
+            if limit is not None and len(symbols) > limit:
+                continue
+            answer, seconds, peak, stats = measure(knowledge, query, method)
+            if not answer:
+                print(f"WARNING: {method} did not find the solution")
+            print(f"{n},{3 * n},{len(symbols)},{method},{seconds:.5f},"
+                  f"{peak / 1024:.1f},{stats.get('models', '')},"
+                  f"{stats.get('pruned', '')},{stats.get('conflicts', '')}")
+
+
+def measure(knowledge, query, method):
+    """
+    Returns (answer, seconds, peak traced bytes, stats) for one check.
+    Time and memory are measured on separate runs, since tracing
+    allocations slows the check down.
+    """
+    stats = {}
+    start = time.perf_counter()
+    answer = model_check(knowledge, query, method=method, stats=stats)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    model_check(knowledge, query, method=method)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return answer, seconds, peak, stats
+
+
+def random_problem(n, rng, ratio=3.5):
+    """
+    Returns (knowledge, query): a random 3-CNF knowledge base over `n`
+    symbols at the given clause-to-symbol ratio, and a random literal.
+    """
+    symbols = [Symbol(f"P{i}") for i in range(n)]
+
+    def literal():
+        symbol = rng.choice(symbols)
+        return symbol if rng.random() < 0.5 else Not(symbol)
+
+    knowledge = And(*[
+        Or(literal(), literal(), literal()) for _ in range(int(n * ratio))
+    ])
+    return knowledge, literal()
+
+
+if __name__ == "__main__":
+    main()
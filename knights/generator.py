@@ -0,0 +1,113 @@
+import random
+import sys
+
+from logic import *
+from sat import KnowledgeBase
+
+# Puzzles tried before giving up on finding one with a unique solution
+ATTEMPTS = 100
+
+
+def main():
+    if len(sys.argv) < 3 or len(sys.argv) > 4:
+        sys.exit("Usage: python generator.py characters statements [seed]")
+    n, m = int(sys.argv[1]), int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    knowledge, symbols, solution = generate_puzzle(n, m, random.Random(seed))
+    for conjunct in knowledge.conjuncts[n:]:
+        print(conjunct.formula())
+    print("Solution:")
+    for symbol in symbols:
+        if symbol in solution:
+            print(f"    {symbol}")
+
+
+def character_name(i):
+    """
+    Returns the name of the `i`th character: A, B, ..., Z, AA, AB, ...
+    """
+    name = ""
+    i += 1
+    while i:
+        i, letter = divmod(i - 1, 26)
+        name = chr(ord("A") + letter) + name
+    return name
+
+
+def generate_puzzle(n, m, rng, attempts=ATTEMPTS):
+    """
+    Returns (knowledge, symbols, solution) for a random knights and
+    knaves puzzle with `n` characters and `m` statements.
+
+    `knowledge` is an And of the rule that everyone is exactly one of
+    knight or knave, followed by one Biconditional per statement: the
+    speaker is a knight exactly when their claim is true. `symbols`
+    lists every "X is a Knight" and "X is a Knave" Symbol, and `solution`
+    is the set of those that are true. Claims are drawn against a hidden
+    random solution so the puzzle is always consistent, and puzzles are
+    redrawn until the knowledge base entails that solution.
+    """
+    for _ in range(attempts):
+        knowledge, symbols, solution = random_puzzle(n, m, rng)
+        answer = And(*[
+            symbol if symbol in solution else Not(symbol)
+            for symbol in symbols
+        ])
+        if KnowledgeBase(knowledge).entails(answer):
+            return knowledge, symbols, solution
+    raise Exception(f"no unique puzzle found in {attempts} attempts")
+
+
+def random_puzzle(n, m, rng):
+    """
+    Returns a (knowledge, symbols, solution) puzzle consistent with a
+    random solution, which is not necessarily the only one.
+    """
+    names = [character_name(i) for i in range(n)]
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+    is_knight = [rng.random() < 0.5 for _ in names]
+
+    knowledge = And()
+    for knight, knave in zip(knights, knaves):
+        knowledge.add(And(Or(knight, knave), Not(And(knight, knave))))
+
+    model = {}
+    for knight, knave, truthful in zip(knights, knaves, is_knight):
+        model[knight.name] = truthful
+        model[knave.name] = not truthful
+
+    for _ in range(m):
+        speaker = rng.randrange(n)
+        claim = random_claim(knights, knaves, rng)
+        if claim.evaluate(model) != is_knight[speaker]:
+            claim = Not(claim)
+        knowledge.add(Biconditional(knights[speaker], claim))
+
+    symbols = [symbol for pair in zip(knights, knaves) for symbol in pair]
+    solution = {symbol for symbol in symbols if model[symbol.name]}
+    return knowledge, symbols, solution
+
+
+def random_claim(knights, knaves, rng):
+    """
+    Returns a random claim about one to three characters, such as
+    "B is a knave", "A and C are the same kind" or "B or C is a knight".
+    """
+    def about(i):
+        return knights[i] if rng.random() < 0.5 else knaves[i]
+
+    size = min(len(knights), rng.choice([1, 1, 2, 2, 3]))
+    characters = rng.sample(range(len(knights)), size)
+    if size == 1:
+        return about(characters[0])
+    if size == 2 and rng.random() < 0.3:
+        first, second = characters
+        return Biconditional(knights[first], knights[second])
+    parts = [about(i) for i in characters]
+    return And(*parts) if rng.random() < 0.5 else Or(*parts)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,138 @@
 import itertools
+import multiprocessing
+import os
+import weakref
+
+# Models evaluated together by the truth table method: 2 ** TABLE_BITS
+TABLE_BITS = 16
+
+# Shared Symbol, Not, Implication and Biconditional nodes, keyed by their
+# tag and the identity of their parts. And and Or can still change with
+# `add`, so they are never swapped for an equal node: a sentence over one
+# always refers to that very And or Or.
+interned = weakref.WeakValueDictionary()
+
+# Bumped whenever `add` changes a sentence that may be part of others.
+# Cached hashes and symbol sets from an older generation are recomputed,
+# since they may include the changed sentence.
+generation = 0
 
 
 class Sentence():
+    __slots__ = ("cached_hash", "cached_symbols", "cached_generation",
+                 "shared", "__weakref__")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return False
+        # Distinct nodes over distinct but equal Ands or Ors are equal, so
+        # only differing hashes settle it without a look at the parts
+        if self.shared and other.shared and hash(self) != hash(other):
+            return False
+        return self.key() == other.key()
+
+    def __hash__(self):
+        if self.cached_generation != generation:
+            self.clear_cache()
+        if self.cached_hash is None:
+            self.cached_hash = hash(self.key())
+        return self.cached_hash
+
+    def __reduce__(self):
+        return (type(self), self.key()[1:])
+
+    def key(self):
+        """Returns a tuple of a tag and the sentence's parts."""
+        raise Exception("nothing to identify")
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave some
+        symbols unassigned. Returns True or False if every completion of
+        the model agrees, and None if the value is still unknown.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns the symbols as a frozenset, computed once and cached."""
+        if self.cached_generation != generation:
+            self.clear_cache()
+        if self.cached_symbols is None:
+            self.cached_symbols = frozenset().union(
+                *[part.symbol_set() for part in self.key()[1:]]
+            )
+        return self.cached_symbols
+
+    def expression(self, index):
+        """
+        Returns Python source evaluating the sentence for a model given
+        as an integer `m`, where symbol `name` is bit `index[name]`.
+        """
+        raise Exception("nothing to compile")
+
+    def bitset(self, columns, mask):
+        """
+        Evaluates the sentence for many models at once. Each model is a
+        bit position; `columns[name]` has the bits set of the models in
+        which symbol `name` is true, and `mask` has every model's bit set.
+        Returns the bits of the models in which the sentence is true.
+        """
+        raise Exception("nothing to evaluate")
 
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def share(cls, sentence):
+        """
+        Marks `sentence` as part of another sentence and returns it, so
+        that `add` knows to invalidate the cached hashes of its parents.
+        """
+        sentence.shared = True
+        return sentence
+
+    @classmethod
+    def shared_node(cls, kind, key, **parts):
+        """
+        Returns the shared `kind` node for `key`, building it from
+        `parts` the first time. Parts are told apart by identity, since
+        they are shared already or are an And or Or that may change.
+        """
+        identity = tuple(
+            id(part) if isinstance(part, Sentence) else part for part in key
+        )
+        sentence = interned.get(identity)
+        if sentence is None:
+            sentence = object.__new__(kind)
+            sentence.clear_cache()
+            sentence.shared = True
+            for name, part in parts.items():
+                setattr(sentence, name, part)
+            interned[identity] = sentence
+        return sentence
+
+    def clear_cache(self):
+        """Forgets the cached hash and symbol set."""
+        self.cached_hash = None
+        self.cached_symbols = None
+        self.cached_generation = generation
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -43,15 +156,13 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def __new__(cls, name):
+        return Sentence.shared_node(cls, ("symbol", name), name=name)
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def key(self):
+        return ("symbol", self.name)
 
     def __repr__(self):
         return self.name
@@ -62,23 +173,38 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self.cached_symbols is None:
+            self.cached_symbols = frozenset([self.name])
+        return self.cached_symbols
+
+    def expression(self, index):
+        return f"(m >> {index[self.name]} & 1)"
+
+    def bitset(self, columns, mask):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        operand = Sentence.share(operand)
+        return Sentence.shared_node(cls, ("not", operand), operand=operand)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def key(self):
+        return ("not", self.operand)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +212,32 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def bitset(self, columns, mask):
+        return self.operand.bitset(columns, mask) ^ mask
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        self.clear_cache()
+        self.shared = False
+        self.conjuncts = [Sentence.share(conjunct) for conjunct in conjuncts]
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def key(self):
+        return ("and", *self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,35 +246,89 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """
+        Adds a conjunct in place. Sentences this one is already part of
+        see the new conjunct, and compare and hash by their new structure:
+
+        >>> a, b, c = Symbol("A"), Symbol("B"), Symbol("C")
+        >>> kb = And(a)
+        >>> old_not, old_implication = Not(kb), Implication(kb, c)
+        >>> kb.add(b)
+        >>> old_not == Not(kb), hash(old_not) == hash(Not(kb))
+        (True, True)
+        >>> old_implication == Implication(And(a, b), c)
+        True
+        >>> sorted(old_implication.symbols())
+        ['A', 'B', 'C']
+
+        Equal Ands stay distinct, so each keeps its own conjuncts:
+
+        >>> base, extra = And(), And()
+        >>> whole = And(base, extra)
+        >>> extra.add(c)
+        >>> base.add(a)
+        >>> whole, model_check(whole, c)
+        (And(And(A), And(C)), True)
+        >>> kb1, kb2 = And(a), And(a)
+        >>> old_not, new_not = Not(kb1), Not(kb2)
+        >>> kb2.add(b)
+        >>> new_not.operand is kb2, new_not.evaluate({"A": True, "B": False})
+        (True, True)
+        """
+        global generation
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        if self.shared:
+            generation += 1
+        self.conjuncts.append(Sentence.share(conjunct))
+        self.clear_cache()
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts
+        ) + ")"
+
+    def bitset(self, columns, mask):
+        bits = mask
+        for conjunct in self.conjuncts:
+            bits &= conjunct.bitset(columns, mask)
+            if not bits:
+                break
+        return bits
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        self.clear_cache()
+        self.shared = False
+        self.disjuncts = [Sentence.share(disjunct) for disjunct in disjuncts]
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def key(self):
+        return ("or", *self.disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,30 +337,53 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts
+        ) + ")"
+
+    def bitset(self, columns, mask):
+        bits = 0
+        for disjunct in self.disjuncts:
+            bits |= disjunct.bitset(columns, mask)
+            if bits == mask:
+                break
+        return bits
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        antecedent = Sentence.share(antecedent)
+        consequent = Sentence.share(consequent)
+        return Sentence.shared_node(
+            cls, ("implies", antecedent, consequent),
+            antecedent=antecedent, consequent=consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def key(self):
+        return ("implies", self.antecedent, self.consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,29 +392,46 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def bitset(self, columns, mask):
+        return ((self.antecedent.bitset(columns, mask) ^ mask)
+                | self.consequent.bitset(columns, mask))
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        left = Sentence.share(left)
+        right = Sentence.share(right)
+        return Sentence.shared_node(
+            cls, ("biconditional", left, right), left=left, right=right
+        )
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def key(self):
+        return ("biconditional", self.left, self.right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,23 +442,76 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
+
+    def bitset(self, columns, mask):
+        return (self.left.bitset(columns, mask)
+                ^ self.right.bitset(columns, mask)
+                ^ mask)
+
+
+def model_check(knowledge, query, method="enumerate", stats=None):
+    """
+    Checks if knowledge base entails query.
+
+    `method` picks the engine: "enumerate" checks every model in turn,
+    "compiled" does the same with both sentences compiled to one Python
+    function of an integer model, "truth table" evaluates whole blocks of
+    models at once as bitsets, "parallel" splits the compiled
+    enumeration across processes, "gray" visits models in Gray-code
+    order and re-evaluates only what the flipped symbol affects,
+    "pruning" stops descending as soon as a partial model decides the
+    answer, and "sat" asks a CDCL solver whether knowledge ∧ ¬query is
+    unsatisfiable.
+
+    If `stats` is a dictionary, the method records what it did in it:
+    "models" visited for the enumerating methods (plus "evaluations" of
+    sub-sentences for "gray"), "nodes" and "pruned" branches for
+    "pruning", and solver counters for "sat".
+    """
+    if method == "compiled":
+        return compiled_model_check(knowledge, query, stats)
+    if method == "parallel":
+        return parallel_model_check(knowledge, query, stats=stats)
+    if method == "pruning":
+        return pruning_model_check(knowledge, query, stats)
+    if method == "gray":
+        return gray_model_check(knowledge, query, stats)
+    if method == "truth table":
+        return truth_table_entails(knowledge, [query], stats)[0]
+    if method == "sat":
+        from sat import sat_entails
+        return sat_entails(knowledge, query, stats)
+    if method != "enumerate":
+        raise ValueError(f"unknown model checking method: {method}")
+
+    if stats is not None:
+        stats["models"] = 0
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
         # If model has an assignment for each symbol
         if not symbols:
+            if stats is not None:
+                stats["models"] += 1
 
             # If knowledge base is true in model, then query must also be true
             if knowledge.evaluate(model):
@@ -261,3 +540,371 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def gray_model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query without recursion or copying
+    models.
+
+    Both sentences are flattened into one list of sub-sentences, children
+    before parents, whose truth values are kept for the current model.
+    Models are visited in Gray-code order, so each step flips a single
+    symbol, and only the sub-sentences containing that symbol are
+    re-evaluated.
+    """
+    nodes, position = flatten(knowledge, query)
+    symbols = sorted(
+        sentence.name for sentence, _ in nodes if isinstance(sentence, Symbol)
+    )
+
+    # For each symbol, the sub-sentences that depend on it, in order
+    affected = {name: [] for name in symbols}
+    for i, (sentence, _) in enumerate(nodes):
+        for name in sentence.symbol_set():
+            affected[name].append(i)
+    affected = [affected[name] for name in symbols]
+
+    operations = [(type(sentence), children) for sentence, children in nodes]
+    parents = [[] for _ in nodes]
+    for i, (_, children) in enumerate(operations):
+        for child in children:
+            parents[child].append(i)
+
+    # Start from the model in which every symbol is false, keeping the
+    # number of true children of each sub-sentence alongside its value
+    values = [False] * len(nodes)
+    true_children = [0] * len(nodes)
+    dirty = [kind is not Symbol for kind, _ in operations]
+    k, q = position[id(knowledge)], position[id(query)]
+
+    def update(indices):
+        """
+        Re-evaluates the sub-sentences at `indices` whose children have
+        changed, flipping the symbol among them. Returns how many were
+        re-evaluated.
+        """
+        evaluated = 0
+        for i in indices:
+            kind, children = operations[i]
+            if kind is Symbol:
+                value = not values[i]
+            elif not dirty[i]:
+                continue
+            else:
+                dirty[i] = False
+                evaluated += 1
+                if kind is And:
+                    value = true_children[i] == len(children)
+                elif kind is Or:
+                    value = true_children[i] > 0
+                elif kind is Not:
+                    value = true_children[i] == 0
+                elif kind is Implication:
+                    value = not values[children[0]] or values[children[1]]
+                else:
+                    value = values[children[0]] == values[children[1]]
+            if value != values[i]:
+                values[i] = value
+                change = 1 if value else -1
+                for parent in parents[i]:
+                    true_children[parent] += change
+                    dirty[parent] = True
+        return evaluated
+
+    evaluations = update([
+        i for i, (kind, _) in enumerate(operations) if kind is not Symbol
+    ])
+    entailed = not values[k] or values[q]
+    step = 1
+    while entailed and step < 1 << len(symbols):
+        flipped = (step & -step).bit_length() - 1
+        evaluations += update(affected[flipped])
+        entailed = not values[k] or values[q]
+        step += 1
+
+    if stats is not None:
+        stats["models"] = step
+        stats["evaluations"] = evaluations
+    return entailed
+
+
+def flatten(*sentences):
+    """
+    Returns (nodes, position) for the distinct sub-sentences of
+    `sentences`. `nodes` lists (sentence, child positions) pairs with
+    every child before its parents, and `position` maps the id of each
+    sub-sentence to its place in `nodes`. Uses an explicit stack, so
+    deeply nested sentences do not hit the recursion limit.
+    """
+    nodes = []
+    position = {}
+    for root in sentences:
+        stack = [(root, False)]
+        while stack:
+            sentence, ready = stack.pop()
+            if id(sentence) in position:
+                continue
+            parts = [] if isinstance(sentence, Symbol) else sentence.key()[1:]
+            if ready:
+                position[id(sentence)] = len(nodes)
+                nodes.append(
+                    (sentence, tuple(position[id(part)] for part in parts))
+                )
+            else:
+                stack.append((sentence, True))
+                stack.extend((part, False) for part in reversed(parts))
+    return nodes, position
+
+
+def pruning_model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query by enumerating partial models,
+    assigning the most frequently occurring symbols first.
+
+    After each assignment both sentences are evaluated with three-valued
+    logic. A branch is pruned once the knowledge base is false in it, or
+    once the knowledge base and query are both true in it; it is a
+    counter-model as soon as the knowledge base is true and the query
+    false.
+    """
+    frequency = symbol_frequencies(knowledge, query)
+    order = sorted(frequency, key=lambda name: (-frequency[name], name))
+    model = {}
+    nodes = pruned = 0
+
+    def check(depth):
+        nonlocal nodes, pruned
+        nodes += 1
+        known = knowledge.evaluate_partial(model)
+        if known is True:
+            holds = query.evaluate_partial(model)
+            if holds is False:
+                return False
+        if known is False or (known is True and holds is True):
+            if depth < len(order):
+                pruned += 1
+            return True
+
+        symbol = order[depth]
+        model[symbol] = True
+        entailed = check(depth + 1)
+        if entailed:
+            model[symbol] = False
+            entailed = check(depth + 1)
+        del model[symbol]
+        return entailed
+
+    entailed = check(0)
+    if stats is not None:
+        stats["nodes"] = nodes
+        stats["pruned"] = pruned
+    return entailed
+
+
+def symbol_frequencies(*sentences):
+    """
+    Returns a dictionary of how many times each symbol occurs in
+    `sentences`.
+    """
+    frequency = {}
+
+    def count(sentence):
+        if isinstance(sentence, Symbol):
+            frequency[sentence.name] = frequency.get(sentence.name, 0) + 1
+        else:
+            for part in sentence.key()[1:]:
+                count(part)
+
+    for sentence in sentences:
+        count(sentence)
+    return frequency
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Returns a function of an integer model `m` that evaluates `sentence`,
+    where the symbol `symbols[i]` is true when bit `i` of `m` is set.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    return eval(f"lambda m: {sentence.expression(index)}")
+
+
+def compiled_model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query by running a compiled
+    counter-model test over every integer model.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    counter_model = compile_sentence(And(knowledge, Not(query)), symbols)
+    models = 1 << len(symbols)
+    found = next(filter(counter_model, range(models)), None)
+    if stats is not None:
+        stats["models"] = models if found is None else found + 1
+    return found is None
+
+
+def parallel_model_check(knowledge, query, processes=None, split=None,
+                         stats=None):
+    """
+    Checks if knowledge base entails query by enumerating models in a
+    pool of `processes` workers (default: one per CPU).
+
+    The first `split` symbols are fixed to each of their 2 ** split
+    combinations, and each combination is a branch enumerated by one
+    worker. Workers receive the counter-model test as compiled Python
+    source, and the pool is stopped as soon as any branch finds a
+    counter-model. If `stats` is a dictionary, the "models" scanned by
+    the branches that finished are recorded in it.
+    """
+    processes = processes or os.cpu_count() or 1
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if split is None:
+        split = (4 * processes - 1).bit_length()
+    split = min(split, len(symbols))
+    index = {name: i for i, name in enumerate(symbols)}
+    source = And(knowledge, Not(query)).expression(index)
+
+    branches = [
+        (source, len(symbols), split, branch) for branch in range(1 << split)
+    ]
+    models = 0
+    entailed = True
+    with multiprocessing.Pool(processes) as pool:
+        for counter_model, scanned in pool.imap_unordered(
+            check_branch, branches
+        ):
+            models += scanned
+            if counter_model:
+                pool.terminate()
+                entailed = False
+                break
+    if stats is not None:
+        stats["models"] = models
+    return entailed
+
+
+# Compiled counter-model tests in a worker process, keyed by their source
+compiled_sources = {}
+
+
+def check_branch(branch):
+    """
+    Returns (found, models): whether a counter-model exists among the
+    models whose low `split` bits equal `fixed`, and how many models
+    were scanned to find out.
+    """
+    source, size, split, fixed = branch
+    if source not in compiled_sources:
+        compiled_sources[source] = eval(f"lambda m: {source}")
+    counter_model = compiled_sources[source]
+    models = range(fixed, 1 << size, 1 << split)
+    found = next(filter(counter_model, models), None)
+    if found is None:
+        return False, len(models)
+    return True, (found - fixed >> split) + 1
+
+
+def truth_table_entails(knowledge, queries, stats=None):
+    """
+    Returns, for each query in `queries`, whether knowledge base entails
+    it, in a single pass over the truth table.
+
+    The table is processed 2 ** TABLE_BITS models at a time. Within a
+    block, the first TABLE_BITS symbols take every combination of values
+    and the remaining symbols are fixed by the block number, so every
+    connective is one bitwise operation on Python integers used as
+    packed boolean columns.
+    """
+    symbols = sorted(set.union(
+        knowledge.symbols(), *[query.symbols() for query in queries]
+    ))
+    low = min(len(symbols), TABLE_BITS)
+    rows = 1 << low
+    mask = (1 << rows) - 1
+    patterns = [truth_table_column(i, rows) for i in range(low)]
+
+    entailed = [True] * len(queries)
+    if stats is not None:
+        stats["models"] = 0
+    for block in range(1 << (len(symbols) - low)):
+        if stats is not None:
+            stats["models"] += rows
+        columns = dict(zip(symbols, patterns))
+        for i, name in enumerate(symbols[low:]):
+            columns[name] = mask if block >> i & 1 else 0
+        models = knowledge.bitset(columns, mask)
+        if not models:
+            continue
+        for i, query in enumerate(queries):
+            if entailed[i] and models & ~query.bitset(columns, mask):
+                entailed[i] = False
+        if not any(entailed):
+            break
+    return entailed
+
+
+def truth_table_column(i, rows):
+    """
+    Returns the `rows`-bit column in which bit `r` is set when bit `i`
+    of the model number `r` is set.
+    """
+    width = 1 << i
+    column = ((1 << width) - 1) << width
+    length = width << 1
+    while length < rows:
+        column |= column << length
+        length <<= 1
+    return column
+
+
+def satisfying_models(knowledge, symbols):
+    """
+    Returns every integer model (bit `i` for `symbols[i]`) in which the
+    knowledge base is true.
+    """
+    evaluate = compile_sentence(knowledge, symbols)
+    return list(filter(evaluate, range(1 << len(symbols))))
+
+
+def model_check_many(knowledge, queries):
+    """
+    Returns, for each query in `queries`, whether knowledge base entails
+    it. The models of the knowledge base are found once and every query
+    is only evaluated in those models.
+    """
+    symbols = sorted(set.union(
+        knowledge.symbols(), *[query.symbols() for query in queries]
+    ))
+    models = satisfying_models(knowledge, symbols)
+    return [
+        all(map(compile_sentence(query, symbols), models))
+        for query in queries
+    ]
+
+
+def entailed_literals(knowledge, symbols=None):
+    """
+    Returns the set of literals (Symbol or Not(Symbol)) over `symbols`
+    that knowledge base entails. `symbols` defaults to the Symbols that
+    appear in the knowledge base.
+    """
+    if symbols is None:
+        symbols = [Symbol(name) for name in knowledge.symbols()]
+    names = sorted(set.union(
+        knowledge.symbols(), {symbol.name for symbol in symbols}
+    ))
+    everywhere = (1 << len(names)) - 1
+    anywhere = 0
+    for model in satisfying_models(knowledge, names):
+        everywhere &= model
+        anywhere |= model
+
+    literals = set()
+    for symbol in symbols:
+        bit = 1 << names.index(symbol.name)
+        if everywhere & bit:
+            literals.add(symbol)
+        if not anywhere & bit:
+            literals.add(Not(symbol))
+    return literals
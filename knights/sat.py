@@ -0,0 +1,468 @@
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+
+class CNFEncoder():
+    """
+    Converts Sentences into clauses of integer literals.
+
+    Every symbol gets a positive variable number and `-v` stands for its
+    negation. Compound subformulas are given fresh variables defined to
+    be equivalent to them (the Tseitin encoding), so the clauses grow
+    linearly with the size of the sentence instead of exponentially.
+    Structurally equal subformulas share one variable.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.variables = {}
+        self.definitions = {}
+        self.clauses = []
+
+    def variable(self, name):
+        """
+        Returns the variable for the symbol called `name`.
+        """
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def fresh(self):
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """
+        Adds clauses asserting that `sentence` is true.
+        """
+        self.clauses.extend(self.assertions(sentence))
+
+    def assertions(self, sentence):
+        """
+        Returns clauses asserting that `sentence` is true. Only the
+        clauses defining its subformulas are added to `clauses`.
+        """
+        if isinstance(sentence, And):
+            return [
+                clause for conjunct in sentence.conjuncts
+                for clause in self.assertions(conjunct)
+            ]
+        if isinstance(sentence, Or):
+            return [
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            ]
+        if isinstance(sentence, Implication):
+            return [[
+                -self.literal(sentence.antecedent),
+                self.literal(sentence.consequent)
+            ]]
+        return [[self.literal(sentence)]]
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding the clauses
+        that define it the first time the sentence is seen.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        if isinstance(sentence, And):
+            literals = [self.literal(c) for c in sentence.conjuncts]
+            x = self.fresh()
+            for literal in literals:
+                self.clauses.append([-x, literal])
+            self.clauses.append([x] + [-literal for literal in literals])
+        elif isinstance(sentence, Or):
+            literals = [self.literal(d) for d in sentence.disjuncts]
+            x = self.fresh()
+            for literal in literals:
+                self.clauses.append([x, -literal])
+            self.clauses.append([-x] + literals)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.fresh()
+            self.clauses.extend([[-x, -a, b], [x, a], [x, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.fresh()
+            self.clauses.extend(
+                [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+            )
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+
+        self.definitions[sentence] = x
+        return x
+
+
+class Solver():
+    """
+    CDCL SAT solver over clauses of integer literals.
+
+    Uses two watched literals per clause for unit propagation, first-UIP
+    clause learning with non-chronological backjumping, VSIDS-style
+    variable activities with phase saving, and geometric restarts.
+    Clauses can be added between calls to `solve`, and learned clauses
+    are kept, so a solver can answer a series of related questions.
+    """
+
+    def __init__(self):
+        self.assigns = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.phases = [False]
+        self.activity = [0.0]
+        self.watches = {}
+        self.trail = []
+        self.trail_limits = []
+        self.queue_head = 0
+        self.order = []
+        self.increment = 1.0
+        self.inconsistent = False
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def ensure(self, variable):
+        """
+        Makes room for variables up to `variable`.
+        """
+        while len(self.assigns) <= variable:
+            v = len(self.assigns)
+            self.assigns.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.phases.append(False)
+            self.activity.append(0.0)
+            self.watches[v] = []
+            self.watches[-v] = []
+            heapq.heappush(self.order, (0.0, v))
+
+    def value(self, literal):
+        value = self.assigns[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def add_clause(self, clause):
+        """
+        Adds a clause (an iterable of non-zero integers). Returns False if
+        the clauses are now unsatisfiable at the root.
+        """
+        if self.inconsistent:
+            return False
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return True
+        for literal in clause:
+            self.ensure(abs(literal))
+        if any(self.value(literal) is True and self.levels[abs(literal)] == 0
+               for literal in clause):
+            return True
+        clause = [
+            literal for literal in clause
+            if not (self.value(literal) is False
+                    and self.levels[abs(literal)] == 0)
+        ]
+        if not clause:
+            self.inconsistent = True
+            return False
+        if len(clause) == 1:
+            self.enqueue(clause[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+                return False
+            return True
+        self.attach(clause)
+        return True
+
+    def attach(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def enqueue(self, literal, reason):
+        variable = abs(literal)
+        self.assigns[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Propagates every unit clause. Returns a conflicting clause, or None.
+        """
+        assigns = self.assigns
+        while self.queue_head < len(self.trail):
+            false_literal = -self.trail[self.queue_head]
+            self.queue_head += 1
+            self.propagations += 1
+            watching = self.watches[false_literal]
+            kept = []
+            for i, clause in enumerate(watching):
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                first_value = assigns[abs(first)]
+                if first_value is not None and first_value == (first > 0):
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = assigns[abs(literal)]
+                    if value is None or value == (literal > 0):
+                        clause[1], clause[k] = literal, false_literal
+                        self.watches[literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value is not None:
+                        kept.extend(watching[i + 1:])
+                        self.watches[false_literal] = kept
+                        return clause
+                    self.enqueue(first, clause)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learned clause, backjump level) for a conflict, using the
+        first unique implication point.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for q in clause:
+                if q == literal:
+                    continue
+                variable = abs(q)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        deepest = max(
+            range(1, len(learned)), key=lambda i: self.levels[abs(learned[i])]
+        )
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-a, v) for v, a in enumerate(self.activity) if v]
+            heapq.heapify(self.order)
+        elif self.assigns[variable] is None:
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.assigns[variable] = None
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.queue_head = start
+
+    def pick(self):
+        """
+        Returns the unassigned variable with the highest activity, or None.
+        """
+        while self.order:
+            _, variable = heapq.heappop(self.order)
+            if self.assigns[variable] is None:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal in
+        `assumptions` true, storing a satisfying assignment in `model` as
+        a dictionary of variable -> bool. Returns False otherwise.
+        """
+        self.model = None
+        if self.inconsistent:
+            return False
+        for literal in assumptions:
+            self.ensure(abs(literal))
+        if self.propagate() is not None:
+            self.inconsistent = True
+            return False
+
+        restart_limit = 100
+        conflicts_since_restart = 0
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts_since_restart += 1
+                    if not self.trail_limits:
+                        self.inconsistent = True
+                        return False
+                    learned, level = self.analyze(conflict)
+                    self.backtrack(level)
+                    if len(learned) == 1:
+                        self.enqueue(learned[0], None)
+                    else:
+                        self.attach(learned)
+                        self.enqueue(learned[0], learned)
+                    self.increment *= 1.05
+                    continue
+
+                if conflicts_since_restart >= restart_limit:
+                    conflicts_since_restart = 0
+                    restart_limit = int(restart_limit * 1.5)
+                    self.backtrack(0)
+                    continue
+
+                level = len(self.trail_limits)
+                if level < len(assumptions):
+                    literal = assumptions[level]
+                    value = self.value(literal)
+                    if value is False:
+                        return False
+                    self.trail_limits.append(len(self.trail))
+                    if value is None:
+                        self.enqueue(literal, None)
+                    continue
+
+                variable = self.pick()
+                if variable is None:
+                    self.model = {
+                        v: self.assigns[v] for v in range(1, len(self.assigns))
+                    }
+                    return True
+                self.decisions += 1
+                self.trail_limits.append(len(self.trail))
+                literal = variable if self.phases[variable] else -variable
+                self.enqueue(literal, None)
+        finally:
+            self.backtrack(0)
+
+
+def sat_entails(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query, by asking a CDCL solver
+    whether knowledge ∧ ¬query is unsatisfiable.
+
+    If `stats` is a dictionary, the solver's conflict, decision and
+    propagation counts are recorded in it.
+    """
+    encoder = CNFEncoder()
+    encoder.add(knowledge)
+    encoder.add(Not(query))
+    solver = Solver()
+    satisfiable = all(solver.add_clause(clause) for clause in encoder.clauses)
+    if satisfiable:
+        satisfiable = solver.solve()
+    if stats is not None:
+        stats["conflicts"] = solver.conflicts
+        stats["decisions"] = solver.decisions
+        stats["propagations"] = solver.propagations
+    return not satisfiable
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that is checked incrementally by one SAT solver.
+
+    Sentences are encoded once as they are added, and the solver keeps
+    its clauses, learned clauses and the encoding of earlier queries
+    between checks. `push` opens a scope and `pop` retracts everything
+    added since the matching `push`: clauses added inside a scope carry
+    that scope's selector literal, which is assumed while the scope is
+    open and falsified for good when it is popped.
+    """
+
+    def __init__(self, *sentences):
+        self.encoder = CNFEncoder()
+        self.solver = Solver()
+        self.scopes = []
+        self.encoded = 0
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """
+        Adds `sentence` to the innermost open scope.
+        """
+        Sentence.validate(sentence)
+        clauses = self.encoder.assertions(sentence)
+        self.flush()
+        for clause in clauses:
+            if self.scopes:
+                clause = clause + [-self.scopes[-1]]
+            self.solver.add_clause(clause)
+
+    def push(self):
+        """
+        Opens a new scope.
+        """
+        self.scopes.append(self.encoder.fresh())
+
+    def pop(self):
+        """
+        Retracts every sentence added since the matching `push`.
+        """
+        if not self.scopes:
+            raise Exception("no scope to pop")
+        self.solver.add_clause([-self.scopes.pop()])
+
+    def entails(self, query):
+        """
+        Checks if the knowledge base entails query.
+        """
+        literal = self.encoder.literal(query)
+        self.flush()
+        return not self.solver.solve(self.scopes + [-literal])
+
+    def consistent(self):
+        """
+        Checks if the knowledge base has at least one model.
+        """
+        return self.solver.solve(self.scopes)
+
+    def flush(self):
+        """
+        Passes newly encoded subformula definitions to the solver. They
+        hold in every scope, so they are never retracted.
+        """
+        for clause in self.encoder.clauses[self.encoded:]:
+            self.solver.add_clause(clause)
+        self.encoded = len(self.encoder.clauses)
@@ -0,0 +1,190 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from crawler import crawl_links
+from incremental import incremental_pagerank
+from pagerank import DAMPING, crawl, iterate_pagerank, sample_pagerank
+from sampling import alias_pagerank
+from sparse import SOLVERS, LinkMatrix
+
+# Largest corpus the dict-based iteration is run on, since every dangling
+# page makes each of its steps quadratic in the number of pages
+DICT_LIMIT = 10000
+
+USAGE = ("Usage: python benchmark.py "
+         "[pages] [links per page] [seed] [samples]")
+
+
+def main():
+    if len(sys.argv) > 5:
+        sys.exit(USAGE)
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    links = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    samples = int(sys.argv[4]) if len(sys.argv) > 4 else 100000
+
+    print(f"{'pages':>8}{'links':>10}{'build':>10}{'sparse':>10}"
+          f"{'steps':>7}{'dict':>10}{'max diff':>10}")
+    pages = 1000
+    while pages <= largest:
+        corpus = synthetic_corpus(pages, links, random.Random(seed))
+        link_count = sum(len(corpus[page]) for page in corpus)
+        row = f"{pages:>8}{link_count:>10}"
+
+        start = time.perf_counter()
+        matrix = LinkMatrix.from_corpus(corpus)
+        row += f"{time.perf_counter() - start:>9.3f}s"
+
+        stats = {}
+        start = time.perf_counter()
+        ranks = matrix.rank(DAMPING, stats=stats)
+        row += f"{time.perf_counter() - start:>9.3f}s{stats['iterations']:>7}"
+
+        if pages <= DICT_LIMIT:
+            start = time.perf_counter()
+            expected = iterate_pagerank(corpus, DAMPING)
+            row += f"{time.perf_counter() - start:>9.3f}s"
+            difference = max(
+                abs(expected[page] - rank)
+                for page, rank in zip(matrix.pages, ranks)
+            )
+            row += f"{difference:>10.2e}"
+        print(row)
+        pages *= 10
+
+    compare_solvers(synthetic_corpus(min(largest, 100000), links,
+                                     random.Random(seed)))
+    compare_samplers(synthetic_corpus(1000, links, random.Random(seed)),
+                     samples, seed)
+    compare_crawlers(synthetic_corpus(10000, links, random.Random(seed)))
+    compare_updates(synthetic_corpus(10000, links, random.Random(seed)),
+                    random.Random(seed))
+
+
+def compare_crawlers(corpus):
+    """
+    Writes `corpus` out as HTML files and prints the time `crawl` and
+    `crawl_links` take to read it back.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, corpus)
+        print(f"Crawling {len(corpus)} pages")
+        for name, crawler in [("dict", crawl), ("stream", crawl_links)]:
+            start = time.perf_counter()
+            crawler(directory)
+            print(f"{name:>8}{time.perf_counter() - start:>9.3f}s")
+
+
+def compare_solvers(corpus, dampings=(0.85, 0.99)):
+    """
+    Prints the time and iterations each solver takes to rank `corpus`,
+    and the L1 distance of its ranks from a tightly converged result.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    print(f"Solving {len(corpus)} pages")
+    for damping in dampings:
+        expected = matrix.rank(damping, tolerance=1e-10)
+        for solver in SOLVERS:
+            stats = {}
+            start = time.perf_counter()
+            ranks = matrix.rank(damping, stats=stats, solver=solver)
+            elapsed = time.perf_counter() - start
+            error = sum(abs(a - b) for a, b in zip(ranks, expected))
+            print(f"{damping:>6}{solver:>14}{elapsed:>9.3f}s"
+                  f"{stats['iterations']:>5} steps  L1 error {error:.1e}")
+
+
+def compare_samplers(corpus, samples, seed):
+    """
+    Prints the time `sample_pagerank` and `alias_pagerank` take to draw
+    `samples` pages of `corpus`, and the L1 distance of their estimates
+    from the ranks found by power iteration.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    expected = dict(zip(matrix.pages, matrix.rank(DAMPING)))
+    print(f"Sampling {samples} pages of {len(corpus)}")
+    for name, sampler in [
+        ("choices", lambda: sample_pagerank(corpus, DAMPING, samples)),
+        ("alias",
+         lambda: alias_pagerank(corpus, DAMPING, samples, seed=seed)),
+    ]:
+        start = time.perf_counter()
+        ranks = sampler()
+        elapsed = time.perf_counter() - start
+        error = sum(
+            abs(ranks.get(page, 0) - expected[page]) for page in expected
+        )
+        print(f"{name:>8}{elapsed:>9.3f}s  L1 error {error:.4f}")
+
+
+def compare_updates(corpus, rng, changes=10):
+    """
+    Ranks `corpus` once, then changes the links of `changes` pages, adds
+    one page and removes another, and prints the time the incremental
+    update and a full recompute take to rank the result.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, corpus)
+        incremental_pagerank(directory, DAMPING)
+
+        pages = list(corpus)
+        changed = {}
+        for page in rng.sample(pages, changes):
+            changed[page] = set(rng.sample(pages, len(corpus[page]) + 1))
+        changed["new.html"] = set(rng.sample(pages, 5))
+        write_corpus(directory, changed)
+        os.remove(os.path.join(directory, pages[-1]))
+
+        print(f"Updating {changes} of {len(corpus)} pages")
+        stats = {}
+        start = time.perf_counter()
+        incremental_pagerank(directory, DAMPING, stats=stats)
+        print(f"{'update':>8}{time.perf_counter() - start:>9.3f}s"
+              f"{stats['iterations']:>4} steps")
+
+        stats = {}
+        start = time.perf_counter()
+        LinkMatrix.from_edges(*crawl_links(directory)).rank(
+            DAMPING, stats=stats
+        )
+        print(f"{'full':>8}{time.perf_counter() - start:>9.3f}s"
+              f"{stats['iterations']:>4} steps")
+
+
+def write_corpus(directory, corpus):
+    """
+    Writes one HTML file per page of `corpus` into `directory`.
+    """
+    for page, targets in corpus.items():
+        with open(os.path.join(directory, page), "w") as f:
+            f.write("<!DOCTYPE html>\n<html>\n<body>\n")
+            for target in targets:
+                f.write(f'<p><a href="{target}">{target}</a></p>\n')
+            f.write("</body>\n</html>\n")
+
+
+def synthetic_corpus(pages, links, rng, dangling=0.1):
+    """
+    Returns a random corpus in the format returned by `crawl`. A
+    `dangling` fraction of the pages have no links, and the rest link to
+    up to 2 * `links` other pages, drawn with a bias towards low page
+    numbers so that some pages become hubs.
+    """
+    names = [f"{i}.html" for i in range(pages)]
+    corpus = {}
+    for i, name in enumerate(names):
+        targets = set()
+        if rng.random() >= dangling:
+            for _ in range(rng.randint(1, 2 * links)):
+                target = int(pages * rng.random() ** 2)
+                if target != i:
+                    targets.add(names[target])
+        corpus[name] = targets
+    return corpus
+
+
+if __name__ == "__main__":
+    main()
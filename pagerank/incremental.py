@@ -0,0 +1,150 @@
+import os
+import pickle
+import sys
+import time
+
+from crawler import crawl_links, extract_links, intern_links
+from pagerank import DAMPING
+from sparse import TOLERANCE, LinkMatrix
+
+# Bump whenever the layout of the saved state changes
+STATE_VERSION = 1
+
+MAGIC = b"PAGERANK\0"
+
+USAGE = "Usage: python incremental.py corpus"
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit(USAGE)
+    directory = sys.argv[1]
+
+    stats = {}
+    start = time.perf_counter()
+    ranks = incremental_pagerank(directory, DAMPING, stats=stats)
+    incremental = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pages, links = crawl_links(directory)
+    LinkMatrix.from_edges(pages, links).rank(DAMPING)
+    full = time.perf_counter() - start
+
+    print(f"PageRank Results from Incremental Iteration")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+    print(f"Crawled {stats['crawled']} of {len(ranks)} pages "
+          f"({stats['added']} added, {stats['removed']} removed), "
+          f"{stats['iterations']} iterations")
+    print(f"Incremental: {incremental:.3f}s, full recompute: {full:.3f}s, "
+          f"saved {full - incremental:.3f}s")
+
+
+def state_path(directory):
+    """
+    Returns the path of the file holding the last ranks of a corpus.
+    """
+    return os.path.join(directory, ".pagerank.snapshot")
+
+
+def page_stamps(directory):
+    """
+    Returns the (mtime in ns, size) of every HTML file in `directory`.
+    """
+    stamps = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(".html"):
+            stat = os.stat(os.path.join(directory, filename))
+            stamps[filename] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def read_state(directory, damping_factor):
+    """
+    Returns the (stamps, hrefs, ranks) saved by `write_state`, or None if
+    there are none or they were saved by another version or for another
+    damping factor.
+    """
+    try:
+        with open(state_path(directory), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            version, damping, stamps, hrefs, ranks = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if version != STATE_VERSION or damping != damping_factor:
+        return None
+    return stamps, hrefs, ranks
+
+
+def write_state(directory, damping_factor, stamps, hrefs, ranks):
+    """
+    Saves the stamp and hrefs of every page, and the ranks found for
+    them, next to the corpus. A directory that cannot be written to is
+    silently skipped.
+    """
+    path = state_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            pickle.dump(
+                (STATE_VERSION, damping_factor, stamps, hrefs, ranks), f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def incremental_pagerank(directory, damping_factor, tolerance=TOLERANCE,
+                         stats=None):
+    """
+    Return PageRank values for each page of the corpus in `directory`,
+    reusing the work of the previous call on the same corpus.
+
+    Only pages that were added or whose mtime or size changed are
+    crawled again; the hrefs of the others come from the saved state.
+    Iteration starts from the previous ranks, with added pages at the
+    uniform rank, so a handful of changed pages needs far fewer steps
+    than starting over. If `stats` is a dictionary, the number of pages
+    "crawled", "added" and "removed" and the "iterations" run are
+    recorded in it.
+    """
+    stamps = page_stamps(directory)
+    state = read_state(directory, damping_factor)
+    old_stamps, old_hrefs, old_ranks = state or ({}, {}, {})
+
+    pages = list(stamps)
+    hrefs = {}
+    crawled = 0
+    for page in pages:
+        if old_stamps.get(page) == stamps[page]:
+            hrefs[page] = old_hrefs[page]
+        else:
+            hrefs[page] = extract_links(os.path.join(directory, page))
+            crawled += 1
+
+    index = {page: i for i, page in enumerate(pages)}
+    links = intern_links(index, [[hrefs[page] for page in pages]])
+    matrix = LinkMatrix.from_edges(pages, links)
+    initial = None
+    if old_ranks:
+        initial = [old_ranks.get(page, 1 / len(pages)) for page in pages]
+    if stats is not None:
+        stats["crawled"] = crawled
+        stats["added"] = len(stamps.keys() - old_stamps.keys())
+        stats["removed"] = len(old_stamps.keys() - stamps.keys())
+    ranks = dict(zip(pages, matrix.rank(
+        damping_factor, tolerance, stats, initial
+    )))
+
+    write_state(directory, damping_factor, stamps, hrefs, ranks)
+    return ranks
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import random
+from array import array
+
+from sparse import LinkMatrix, compress
+
+# Steps a surfer walks with its tables bound to local variables
+BATCH = 1 << 20
+
+
+class AliasSurfer():
+    """
+    Random surfer whose next page is drawn in constant time from a
+    Walker alias table per page.
+
+    The table of page `p` covers `targets[offsets[p]:offsets[p + 1]]`:
+    one entry per link, each weighted `damping_factor` / links, and a
+    final teleport entry (target -1) weighted 1 - `damping_factor`, or 1
+    for a page with no links. Landing on the teleport entry picks a page
+    uniformly at random, which is the rest of the transition model.
+    """
+
+    def __init__(self, matrix, damping_factor):
+        """
+        Builds the tables for a `LinkMatrix`.
+        """
+        self.pages = matrix.pages
+        count = len(matrix.pages)
+        offsets = matrix.offsets
+        link_targets = array("l")
+        for target in range(count):
+            link_targets.extend(
+                [target] * (offsets[target + 1] - offsets[target])
+            )
+        out_offsets, out_links = compress(count, matrix.sources, link_targets)
+
+        self.offsets = array("l", [0]) * (count + 1)
+        self.targets = array("l")
+        self.probability = array("d")
+        self.alias = array("l")
+        for page in range(count):
+            links = out_links[out_offsets[page]:out_offsets[page + 1]]
+            if links:
+                weights = [damping_factor / len(links)] * len(links)
+                weights.append(1 - damping_factor)
+            else:
+                weights = [1.0]
+            probability, alias = alias_table(weights)
+            self.targets.extend(links)
+            self.targets.append(-1)
+            self.probability.extend(probability)
+            self.alias.extend(alias)
+            self.offsets[page + 1] = len(self.targets)
+
+    def walk(self, page, steps, rng, counts):
+        """
+        Takes `steps` steps from `page`, adding one to `counts[p]` for
+        every visit to page `p`. Returns the page the surfer ended on.
+        """
+        count = len(self.pages)
+        offsets = self.offsets
+        targets = self.targets
+        probability = self.probability
+        alias = self.alias
+        draw = rng.random
+        for _ in range(steps):
+            start = offsets[page]
+            u = draw() * (offsets[page + 1] - start)
+            column = int(u)
+            if u - column >= probability[start + column]:
+                column = alias[start + column]
+            page = targets[start + column]
+            if page < 0:
+                page = int(draw() * count)
+            counts[page] += 1
+        return page
+
+
+def alias_table(weights):
+    """
+    Returns (probability, alias) lists for Walker's alias method over
+    `weights`: to sample, pick a column `i` uniformly and keep it with
+    probability `probability[i]`, otherwise take `alias[i]`.
+    """
+    size = len(weights)
+    total = sum(weights)
+    scaled = [weight * size / total for weight in weights]
+    probability = [1.0] * size
+    alias = list(range(size))
+    small = [i for i, weight in enumerate(scaled) if weight < 1]
+    large = [i for i, weight in enumerate(scaled) if weight >= 1]
+    while small and large:
+        less = small.pop()
+        more = large[-1]
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1 - scaled[less]
+        if scaled[more] < 1:
+            small.append(large.pop())
+    return probability, alias
+
+
+def alias_pagerank(corpus, damping_factor, n, processes=None, seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages, like
+    `sample_pagerank`, but with alias tables and integer visit counts.
+
+    The samples are split between independent surfers, one per worker in
+    a pool of `processes` (default: one per CPU), each starting from a
+    random page and walking in batches of `BATCH` steps. Their visit
+    counts are summed and only divided by `n` at the end.
+    """
+    surfer = AliasSurfer(LinkMatrix.from_corpus(corpus), damping_factor)
+    processes = processes or os.cpu_count() or 1
+    seeds = random.Random(seed)
+    walks = []
+    for i in range(processes):
+        steps = n // processes + (i < n % processes)
+        walks.append((seeds.getrandbits(64), steps))
+
+    counts = array("l", [0]) * len(surfer.pages)
+    if processes == 1:
+        load_surfer(surfer)
+        counts = merge(counts, map(surf, walks))
+    else:
+        with multiprocessing.Pool(processes, initializer=load_surfer,
+                                  initargs=(surfer,)) as pool:
+            counts = merge(counts, pool.imap_unordered(surf, walks))
+    return {page: counts[i] / n for i, page in enumerate(surfer.pages)}
+
+
+def merge(counts, results):
+    """
+    Adds every array of visit counts in `results` into `counts`.
+    """
+    for result in results:
+        for page, visits in enumerate(result):
+            counts[page] += visits
+    return counts
+
+
+# The surfer of a pool worker, set by `load_surfer`
+worker_surfer = None
+
+
+def load_surfer(surfer):
+    """
+    Gives a pool worker the surfer to walk with.
+    """
+    global worker_surfer
+    worker_surfer = surfer
+
+
+def surf(walk):
+    """
+    Returns the visit counts of one surfer taking `steps` steps from a
+    random page, seeded with `seed`.
+    """
+    seed, steps = walk
+    rng = random.Random(seed)
+    page = rng.randrange(len(worker_surfer.pages))
+    counts = array("l", [0]) * len(worker_surfer.pages)
+    for start in range(0, steps, BATCH):
+        page = worker_surfer.walk(
+            page, min(steps - start, BATCH), rng, counts
+        )
+    return counts
@@ -0,0 +1,252 @@
+from array import array
+from operator import mul
+
+# Iteration stops once the ranks change by less than this in total (L1)
+TOLERANCE = 1e-6
+
+# Iteration also stops after this many steps, converged or not
+MAX_ITERATIONS = 1000
+
+SOLVERS = ["jacobi", "gauss-seidel", "aitken"]
+
+# Steps of power iteration between two Aitken extrapolations
+EXTRAPOLATION_PERIOD = 10
+
+
+class LinkMatrix():
+    """
+    Link structure of a corpus stored as compressed sparse rows.
+
+    Pages are interned to dense integers. The pages linking to page `p`
+    are `sources[offsets[p]:offsets[p + 1]]`, `out_degree[p]` is how many
+    links page `p` has, and `dangling` lists the pages with none, so one
+    step of power iteration only reads from flat integer arrays.
+    """
+
+    def __init__(self, pages, links):
+        """
+        Builds the matrix from a list of page names and an iterable of
+        (source, target) pairs of indices into `pages`.
+        """
+        self.pages = pages
+        count = len(pages)
+        link_sources = array("l")
+        link_targets = array("l")
+        out_degree = array("l", [0]) * count
+        for source, target in links:
+            link_sources.append(source)
+            link_targets.append(target)
+            out_degree[source] += 1
+        self.out_degree = out_degree
+        self.dangling = array(
+            "l", (page for page in range(count) if not out_degree[page])
+        )
+        self.offsets, self.sources = compress(
+            count, link_targets, link_sources
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds the matrix from the dictionary returned by `crawl`.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        links = (
+            (index[page], index[link])
+            for page in pages
+            for link in corpus[page]
+        )
+        return cls(pages, links)
+
+    @classmethod
+    def from_edges(cls, pages, links):
+        """
+        Builds the matrix from the (pages, links) returned by
+        `crawler.crawl_links` or `crawler.read_edges`, where `links` is a
+        flat array of (source, target) index pairs.
+        """
+        return cls(pages, zip(links[0::2], links[1::2]))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def rank(self, damping_factor, tolerance=TOLERANCE, stats=None,
+             initial=None, solver="jacobi", max_iterations=MAX_ITERATIONS):
+        """
+        Returns the list of PageRank values, indexed like `pages`, by
+        iterating until the L1 norm of the change in one step is below
+        `tolerance`, or for at most `max_iterations` steps, since
+        rounding can keep the change above a very small tolerance
+        forever. Iteration starts from the `initial` list of ranks if
+        given, such as those of an earlier run, and from the uniform
+        distribution otherwise.
+
+        `solver` picks how each step is taken: "jacobi" is plain power
+        iteration, "gauss-seidel" updates ranks in place so later pages
+        in a sweep already see the new ranks, and "aitken" extrapolates
+        from the last three iterates every `EXTRAPOLATION_PERIOD` steps
+        for as long as that helps. Aitken only pays off on slowly mixing
+        graphs: it halves the steps on corpus2 at damping 0.99 (105
+        against 225) but takes more than Jacobi on the synthetic graphs
+        of benchmark.py (23 against 17).
+
+        The rank of dangling pages is spread evenly over all pages, as in
+        `iterate_pagerank`. If `stats` is a dictionary, the number of
+        "iterations", the final "residual", the list of "residuals" after
+        every step and whether the ranks "converged" within
+        `max_iterations` are recorded in it. A run cut off by
+        `max_iterations` ends with a plain step, so the last of its
+        "residuals" is the true change and still at least `tolerance`.
+        """
+        if solver not in SOLVERS:
+            raise ValueError(f"unknown solver: {solver}")
+        if tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+        if max_iterations < 1:
+            raise ValueError("max_iterations must be at least 1")
+        count = len(self.pages)
+        inverse_degree = [1 / degree if degree else 0.0
+                          for degree in self.out_degree]
+        if initial is None:
+            ranks = [1 / count] * count
+        else:
+            total = sum(initial)
+            ranks = [rank / total for rank in initial]
+
+        residuals = []
+        previous = []
+        extrapolating = True
+        converged = False
+        while len(residuals) < max_iterations:
+            if solver == "gauss-seidel":
+                residual = self.sweep(ranks, inverse_degree, damping_factor)
+            else:
+                new_ranks = self.step(ranks, inverse_degree, damping_factor)
+                residual = sum(map(abs, map(float.__sub__, new_ranks, ranks)))
+                # The last step allowed is not extrapolated, so its
+                # residual shows how far off a cut-off run is
+                if solver == "aitken":
+                    previous = previous[-1:] + [ranks]
+                    if (extrapolating
+                            and len(residuals) < max_iterations - 1
+                            and (len(residuals) + 1)
+                            % EXTRAPOLATION_PERIOD == 0):
+                        new_ranks = extrapolate(*previous, new_ranks)
+                ranks = new_ranks
+            residuals.append(residual)
+
+            # Give up on extrapolating once it makes the next step worse
+            if (solver == "aitken" and len(residuals) > EXTRAPOLATION_PERIOD
+                    and len(residuals) % EXTRAPOLATION_PERIOD == 1
+                    and residuals[-1] > residuals[-2]):
+                extrapolating = False
+            if residual < tolerance:
+                converged = True
+                break
+
+        total = sum(ranks)
+        ranks = [rank / total for rank in ranks]
+        if stats is not None:
+            stats["iterations"] = len(residuals)
+            stats["residual"] = residual
+            stats["residuals"] = residuals
+            stats["converged"] = converged
+        return ranks
+
+    def step(self, ranks, inverse_degree, damping_factor):
+        """
+        Returns the ranks after one step of power iteration.
+        """
+        offsets = self.offsets
+        sources = self.sources
+        share = list(map(mul, ranks, inverse_degree))
+        dangling = sum(ranks[page] for page in self.dangling)
+        base = (1 - damping_factor + damping_factor * dangling) / len(ranks)
+        return [
+            base + damping_factor * sum(map(share.__getitem__, sources[
+                offsets[page]:offsets[page + 1]
+            ]))
+            for page in range(len(ranks))
+        ]
+
+    def sweep(self, ranks, inverse_degree, damping_factor):
+        """
+        Updates `ranks` in place with one Gauss-Seidel sweep over every
+        page and returns the L1 norm of the change. The dangling rank is
+        taken from the start of the sweep, and the ranks are scaled back
+        to sum to 1 at the end.
+        """
+        offsets = self.offsets
+        sources = self.sources
+        share = list(map(mul, ranks, inverse_degree))
+        dangling = sum(ranks[page] for page in self.dangling)
+        base = (1 - damping_factor + damping_factor * dangling) / len(ranks)
+        residual = 0.0
+        for page in range(len(ranks)):
+            rank = base + damping_factor * sum(map(share.__getitem__, sources[
+                offsets[page]:offsets[page + 1]
+            ]))
+            residual += abs(rank - ranks[page])
+            ranks[page] = rank
+            share[page] = rank * inverse_degree[page]
+        total = sum(ranks)
+        ranks[:] = [rank / total for rank in ranks]
+        return residual
+
+
+def extrapolate(oldest, older, ranks):
+    """
+    Returns the Aitken delta-squared extrapolation of three successive
+    rank lists, page by page. Pages whose differences are too small to
+    extrapolate, or whose extrapolated rank would not be positive, keep
+    their latest rank.
+    """
+    extrapolated = []
+    for x0, x1, x2 in zip(oldest, older, ranks):
+        first = x1 - x0
+        second = x2 - x1
+        curvature = second - first
+        if abs(curvature) > 1e-15:
+            estimate = x2 - second * second / curvature
+            if estimate > 0:
+                x2 = estimate
+        extrapolated.append(x2)
+    total = sum(extrapolated)
+    return [rank / total for rank in extrapolated]
+
+
+def compress(row_count, rows, columns):
+    """
+    Returns (offsets, values) CSR arrays for the (row, column) pairs
+    given as two parallel arrays, using a counting sort on `rows`.
+    """
+    offsets = array("l", [0]) * (row_count + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for row in range(row_count):
+        offsets[row + 1] += offsets[row]
+
+    values = array("l", [0]) * len(rows)
+    position = offsets[:-1]
+    for row, column in zip(rows, columns):
+        values[position[row]] = column
+        position[row] += 1
+    return offsets, values
+
+
+def sparse_pagerank(corpus, damping_factor, tolerance=TOLERANCE, stats=None,
+                    solver="jacobi", max_iterations=MAX_ITERATIONS):
+    """
+    Return PageRank values for each page by iterating over a sparse link
+    matrix with `solver`, like `iterate_pagerank` but in O(links) per
+    step, stopping once the ranks change by less than `tolerance` (L1)
+    or after `max_iterations` steps.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value. All PageRank values sum to 1.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    ranks = matrix.rank(damping_factor, tolerance, stats, solver=solver,
+                        max_iterations=max_iterations)
+    return dict(zip(matrix.pages, ranks))